@@ -12,8 +12,11 @@ de datos climáticos, incluyendo generación de gráficos y un mapa.
 import streamlit as st
 #import pandas as pd #
 import datetime as dt
+import io
 import utils as utl
 import api as api
+import climatologia
+import metricas
 import folium
 from streamlit_folium import st_folium
 
@@ -28,7 +31,7 @@ st.set_page_config(
 st.markdown(
     """
     <style>
-    .stDownloadButton > button {
+    .stDownloadButton > button, .stButton > button {
         width: 100% !important;
     }
     </style>
@@ -36,6 +39,55 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+@st.cache_resource(show_spinner=False)
+def mantenerCacheHttp():
+    """
+    Elimina las respuestas vencidas de la caché HTTP una sola vez por proceso.
+    """
+    api.limpiarCacheHttp()
+
+
+mantenerCacheHttp()
+
+# Vigencia del CSV de los rangos que llegan a los días que el archivo todavía no publicó
+VENCIMIENTO_CSV_RECIENTE = dt.timedelta(hours=1)
+
+
+def serializarHistorialCsv(lat, lng, fecha_desde, fecha_hasta):
+    """
+    Descarga el historial de una ubicación y lo serializa a CSV por bloques de filas,
+    aplicando el formato de fecha solo en este paso.
+    """
+    historial = api.obtenerTemperaturaHistorica(lat, lng, fecha_desde, fecha_hasta)
+
+    buffer = io.BytesIO()
+    historial.to_csv(buffer, index=False, chunksize=5000, date_format=utl.FORMATO_FECHA)
+
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def historialCsvCerrado(lat, lng, fecha_desde, fecha_hasta):
+    return serializarHistorialCsv(lat, lng, fecha_desde, fecha_hasta)
+
+
+@st.cache_data(ttl=VENCIMIENTO_CSV_RECIENTE, max_entries=32, show_spinner=False)
+def historialCsvReciente(lat, lng, fecha_desde, fecha_hasta):
+    return serializarHistorialCsv(lat, lng, fecha_desde, fecha_hasta)
+
+
+def prepararHistorialCsv(lat, lng, fecha_desde, fecha_hasta):
+    """
+    Devuelve el CSV del historial en caché por ubicación y rango de fechas. Los rangos
+    que llegan a los días recientes vencen a la hora, para incluir los días que el
+    archivo publique después; los demás ya no cambian y no vencen.
+    """
+    if api.archivoReciente(fecha_hasta):
+        return historialCsvReciente(lat, lng, fecha_desde, fecha_hasta)
+
+    return historialCsvCerrado(lat, lng, fecha_desde, fecha_hasta)
+
+
 # Generación del menú de navegación
 utl.generarMenu()
 
@@ -50,26 +102,24 @@ condiciones climáticas.
 
 st.divider()
 
-# Carga y procesamiento de datos geográficos
-data = utl.obtenerPaises()
+# Carga del índice de países y ciudades
+indice = utl.obtenerIndiceCiudades()
 
 # Distribución de elementos en columnas
 col1, col2, col3, col4, col5 = st.columns(5)
 
 # Selector de país
 with col1:
-    countries = data["country"].unique()
+    countries = indice.paises
     country = st.selectbox('País', options=countries, index=8)
 
 # Selector de ciudad
 with col2:
-    country_data = data.loc[data["country"] == country, :]
-    cities = country_data["city_ascii"].unique()
+    cities = indice.ciudadesDe(country)
     city = st.selectbox('Ciudad', options=cities)
 
 # Obtención de coordenadas geográficas
-lat = float(country_data.loc[data["city_ascii"] == city, "lat"].iloc[0])
-lng = float(country_data.loc[data["city_ascii"] == city, "lng"].iloc[0])
+lat, lng = indice.coordenadas(country, city)
 
 # Configuración de fechas para el análisis histórico
 fecha_min = min_value=dt.date(2020, 1, 1)
@@ -85,18 +135,29 @@ with col4:
     fecha_hasta = st.date_input("Fecha hasta", fecha_max, format="DD/MM/YYYY", 
                                min_value=fecha_min, max_value=fecha_max)
 
-# Botón de descarga de datos históricos
+# Botón de descarga de datos históricos: el historial solo se descarga cuando se pide
 with col5:
     st.write('<div style="height: 1.7em;">Datos</div>', unsafe_allow_html=True)
-    st.download_button(
-        label="Descargar historial",
-        data=api.obtenerTemperaturaHistorica(lat, lng, fecha_desde, fecha_hasta).to_csv(index=False),
-        file_name=f"{country}_{city}_{fecha_desde}_{fecha_hasta}.csv"
-    )
+    solicitud = (lat, lng, fecha_desde, fecha_hasta)
+
+    if st.session_state.get("historial_preparado") == solicitud:
+        st.download_button(
+            label="Descargar historial",
+            data=prepararHistorialCsv(*solicitud),
+            file_name=f"{country}_{city}_{fecha_desde}_{fecha_hasta}.csv",
+            mime="text/csv"
+        )
+    elif st.button("Preparar historial"):
+        with st.spinner("Obteniendo historial..."):
+            prepararHistorialCsv(*solicitud)
+        st.session_state["historial_preparado"] = solicitud
+        st.rerun()
 
 st.divider()
 
-# Obtención y visualización de datos meteorológicos actuales
+# Obtención y visualización de datos meteorológicos actuales; los pronósticos de
+# las ciudades más consultadas se mantienen renovados en segundo plano
+api.iniciarRenovador()
 temp_json, temp_actual = api.obtenerTemperaturaActual(lat, lng)
 
 st.subheader(f"{':sun_with_face:' if temp_json['is_day'] == 1 else ':new_moon_with_face:'} Temperatura en {city}, {country}")
@@ -110,11 +171,23 @@ col1, col2 = st.columns([1, 2])
 with col1:
     st.subheader("Pronóstico para la Semana")
     st.write('Pronóstico de temperatura y lluvia para la próxima semana.', unsafe_allow_html=True)
-    st.dataframe(utl.temperaturaDiaria(temp_actual), use_container_width=True, hide_index=True)
+    resumen_diario = utl.temperaturaDiaria(temp_actual)
+    with metricas.medir("streamlit.dataframe"):
+        st.dataframe(resumen_diario, use_container_width=True, hide_index=True)
+
+    # Alertas de días anómalos respecto de la climatología del historial guardado
+    clima = climatologia.obtenerClimatologia(lat, lng)
+    if clima is not None:
+        anomalias = climatologia.anomaliasPronostico(temp_actual, clima)
+        for _, dia in anomalias[anomalias['anomalo']].iterrows():
+            st.warning(f":thermometer: {dia['Fecha']:%d/%m}: máxima de {dia['Máxima °C']:.1f} °C "
+                       f"(z = {dia['z_temperature_2m_max']:+.1f}) y mínima de {dia['Mínima °C']:.1f} °C "
+                       f"(z = {dia['z_temperature_2m_min']:+.1f}), fuera de lo habitual para la fecha.")
 
 with col2:
-    fig = utl.mostrarGraficoSemanal(temp_actual)
-    st.pyplot(fig)
+    imagen_semanal = utl.renderizarGrafico(utl.mostrarGraficoSemanal, temp_actual)
+    with metricas.medir("streamlit.image"):
+        st.image(imagen_semanal, use_column_width=True)
 
 st.divider()
 
@@ -133,4 +206,11 @@ folium.Marker(
 ).add_to(m)
 
 # Mostrar el mapa
-st_data = st_folium(m, width=1200, height=420, returned_objects=[])
+st_data = st_folium(m, width=1200, height=420, returned_objects=["last_clicked"])
+
+# Ciudad más cercana al punto seleccionado en el mapa
+if st_data and st_data.get("last_clicked"):
+    punto = st_data["last_clicked"]
+    cercana = indice.ciudadMasCercana(punto["lat"], punto["lng"])[0]
+    st.info(f"La ciudad más cercana al punto seleccionado es {cercana['city_ascii']}, "
+            f"{cercana['country']}, a {cercana['distancia_km']:.1f} km.")
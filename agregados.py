@@ -0,0 +1,167 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa un cubo de agregados precalculados (diario, semanal,
+mensual, anual y climatología por mes) con media, mínimo, máximo, suma y
+cantidad de registros por variable. Cada nivel se calcula a partir del nivel
+más fino, y al agregar filas nuevas solo se recalculan los períodos afectados.
+"""
+
+import pandas as pd
+
+# Niveles del cubo y su regla de agrupación
+NIVELES = {
+    'diario': 'D',
+    'semanal': 'W',
+    'mensual': 'ME',
+    'anual': 'YE',
+}
+
+# Nivel del que se deriva cada uno (el diario se calcula desde los datos originales)
+NIVEL_BASE = {
+    'semanal': 'diario',
+    'mensual': 'diario',
+    'anual': 'mensual',
+}
+
+# Período de pandas equivalente a cada regla, para ubicar el inicio de un período
+PERIODOS = {'D': 'D', 'W': 'W', 'ME': 'M', 'YE': 'Y'}
+
+ESTADISTICOS = ['mean', 'min', 'max', 'sum', 'count']
+
+
+def agregarDatos(df, regla):
+    """
+    Agrega los datos originales con una regla de pandas y devuelve todos los estadísticos
+    en columnas (variable, estadístico).
+    """
+    return df.resample(regla).agg(ESTADISTICOS)
+
+
+def combinarAgregados(agregados, regla):
+    """
+    Reagrupa un nivel ya agregado en períodos más largos sin volver a los datos
+    originales: suma las sumas y cantidades, toma el mínimo de los mínimos y el
+    máximo de los máximos, y recalcula la media como suma / cantidad.
+    """
+    sumas = agregados.xs('sum', axis=1, level=1).resample(regla).sum()
+    cantidades = agregados.xs('count', axis=1, level=1).resample(regla).sum()
+
+    resultado = pd.concat({
+        'mean': sumas / cantidades.where(cantidades > 0),
+        'min': agregados.xs('min', axis=1, level=1).resample(regla).min(),
+        'max': agregados.xs('max', axis=1, level=1).resample(regla).max(),
+        'sum': sumas,
+        'count': cantidades,
+    }, axis=1)
+
+    # Mismo orden de columnas que agregarDatos: (variable, estadístico)
+    return resultado.swaplevel(axis=1).reindex(columns=agregados.columns)
+
+
+def climatologiaMensual(mensual):
+    """
+    Calcula la climatología de cada mes del año (1 a 12) a partir del nivel mensual.
+    """
+    meses = mensual.index.month
+    sumas = mensual.xs('sum', axis=1, level=1).groupby(meses).sum()
+    cantidades = mensual.xs('count', axis=1, level=1).groupby(meses).sum()
+
+    resultado = pd.concat({
+        'mean': sumas / cantidades.where(cantidades > 0),
+        'min': mensual.xs('min', axis=1, level=1).groupby(meses).min(),
+        'max': mensual.xs('max', axis=1, level=1).groupby(meses).max(),
+        'sum': sumas,
+        'count': cantidades,
+    }, axis=1)
+    resultado.index.name = 'month'
+
+    return resultado.swaplevel(axis=1).reindex(columns=mensual.columns)
+
+
+class CuboAgregados:
+    """
+    Pirámide de agregados de un historial indexado por fecha.
+    """
+
+    def __init__(self, df):
+        self.datos = df.select_dtypes('number').sort_index()
+        self.niveles = {}
+        self._construir()
+
+    def _construir(self):
+        """
+        Calcula todos los niveles a partir de los datos originales.
+        """
+        self.niveles['diario'] = agregarDatos(self.datos, NIVELES['diario'])
+        for nivel, base in NIVEL_BASE.items():
+            self.niveles[nivel] = combinarAgregados(self.niveles[base], NIVELES[nivel])
+        self.climatologia = climatologiaMensual(self.niveles['mensual'])
+
+    def agregar(self, df_nuevo):
+        """
+        Incorpora filas nuevas y actualiza solo los períodos que las contienen.
+        Si las filas se superponen con las existentes se recalcula todo el cubo.
+        """
+        df_nuevo = df_nuevo.select_dtypes('number').sort_index()
+        if df_nuevo.empty:
+            return
+
+        if len(self.datos) and df_nuevo.index.min() <= self.datos.index.max():
+            datos = pd.concat([self.datos, df_nuevo])
+            self.datos = datos[~datos.index.duplicated(keep='last')].sort_index()
+            self._construir()
+            return
+
+        self.datos = pd.concat([self.datos, df_nuevo])
+        desde = df_nuevo.index.min()
+
+        # Nivel diario: solo se recalculan los días desde la primera fila nueva
+        self.niveles['diario'] = self._actualizar(
+            'diario', agregarDatos(self.datos[self.datos.index >= desde.floor('D')], 'D'))
+
+        # Niveles superiores: se reagrupan desde el inicio del período afectado
+        for nivel, base in NIVEL_BASE.items():
+            regla = NIVELES[nivel]
+            inicio = desde.to_period(PERIODOS[regla]).start_time
+            origen = self.niveles[base]
+            self.niveles[nivel] = self._actualizar(
+                nivel, combinarAgregados(origen[origen.index >= inicio], regla))
+
+        self.climatologia = climatologiaMensual(self.niveles['mensual'])
+
+    def _actualizar(self, nivel, recalculado):
+        """
+        Reemplaza en un nivel los períodos recalculados y conserva los anteriores.
+        """
+        actual = self.niveles[nivel]
+        if recalculado.empty:
+            return actual
+
+        return pd.concat([actual[actual.index < recalculado.index.min()], recalculado])
+
+    def nivelPara(self, num_dias):
+        """
+        Elige el nivel de detalle adecuado para mostrar una cantidad de días.
+        """
+        if num_dias <= 30:
+            return 'diario'
+        elif num_dias <= 180:
+            return 'semanal'
+        elif num_dias <= 2000:
+            return 'mensual'
+
+        return 'anual'
+
+    def serie(self, nivel, estadistico='mean', desde=None, hasta=None):
+        """
+        Devuelve un estadístico de todas las variables en un nivel, con una columna
+        por variable, opcionalmente limitado a una ventana de fechas.
+        """
+        datos = self.niveles[nivel].xs(estadistico, axis=1, level=1)
+
+        return datos.loc[desde:hasta]
@@ -0,0 +1,239 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa un almacén local de series diarias históricas en
+formato Parquet, organizado por ubicación (coordenadas redondeadas) y por
+variable, de modo que solo se descarguen los rangos de fechas faltantes.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Constantes globales
+DIR_HISTORIAL = '.historial'
+PRECISION_COORDENADAS = 2
+
+# Bloqueos por ubicación para evitar escrituras simultáneas desde distintas sesiones y procesos
+_bloqueos = {}
+_bloqueo_registro = threading.Lock()
+
+
+def claveUbicacion(lat, lng):
+    """
+    Genera la clave de una ubicación redondeando sus coordenadas.
+    """
+    return f"{round(float(lat), PRECISION_COORDENADAS):.{PRECISION_COORDENADAS}f}_" \
+           f"{round(float(lng), PRECISION_COORDENADAS):.{PRECISION_COORDENADAS}f}"
+
+
+class BloqueoUbicacion:
+    """
+    Bloqueo de una ubicación entre los hilos del proceso y entre procesos (bloqueo
+    del sistema operativo sobre un archivo), para que la lectura, combinación y
+    escritura de sus series no se intercale con la de otra sesión o de los
+    procesos de la exportación masiva.
+    """
+
+    def __init__(self, clave):
+        self.clave = clave
+        self._hilos = threading.Lock()
+        self._archivo = None
+
+    def __enter__(self):
+        self._hilos.acquire()
+        try:
+            os.makedirs(DIR_HISTORIAL, exist_ok=True)
+            self._archivo = open(os.path.join(DIR_HISTORIAL, f"{self.clave}.lock"), 'a+b')
+            if fcntl:
+                fcntl.flock(self._archivo, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._archivo.seek(0)
+                        msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass  # LK_LOCK se rinde tras 10 segundos: se vuelve a intentar
+        except BaseException:
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+            self._hilos.release()
+            raise
+
+        return self
+
+    def __exit__(self, *excepcion):
+        try:
+            if fcntl:
+                fcntl.flock(self._archivo, fcntl.LOCK_UN)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+            self._archivo.close()
+        finally:
+            self._archivo = None
+            self._hilos.release()
+
+
+def bloqueoUbicacion(lat, lng):
+    """
+    Devuelve el bloqueo asociado a una ubicación, creándolo si no existe.
+    """
+    clave = claveUbicacion(lat, lng)
+    with _bloqueo_registro:
+        return _bloqueos.setdefault(clave, BloqueoUbicacion(clave))
+
+
+def rutaSerie(lat, lng, variable):
+    """
+    Devuelve la ruta del archivo Parquet de una variable para una ubicación.
+    """
+    return os.path.join(DIR_HISTORIAL, claveUbicacion(lat, lng), f"{variable}.parquet")
+
+
+def aFechaDia(fecha):
+    """
+    Convierte una fecha (date, str o Timestamp) a datetime64 con resolución diaria.
+    """
+    return np.datetime64(pd.Timestamp(fecha).date(), 'D')
+
+
+def leerSerie(lat, lng, variable):
+    """
+    Lee la serie almacenada de una variable. Devuelve un DataFrame vacío si no existe.
+    """
+    ruta = rutaSerie(lat, lng, variable)
+    if not os.path.exists(ruta):
+        return pd.DataFrame({'date': np.array([], dtype='datetime64[ns]'),
+                             variable: np.array([], dtype='float32')})
+
+    return pq.read_table(ruta, memory_map=True).to_pandas()
+
+
+def guardarSerie(lat, lng, variable, df):
+    """
+    Escribe la serie de una variable de forma atómica (archivo temporal + reemplazo).
+    """
+    ruta = rutaSerie(lat, lng, variable)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+    tabla = pa.Table.from_pandas(df[['date', variable]], preserve_index=False)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    pq.write_table(tabla, temporal)
+    os.replace(temporal, ruta)
+
+
+def tramosContiguos(mascara):
+    """
+    Devuelve los pares de índices (inicio, fin), ambos inclusive, de cada tramo
+    contiguo de valores verdaderos en una máscara booleana.
+    """
+    bordes = np.diff(np.concatenate(([0], mascara.astype(np.int8), [0])))
+    inicios = np.flatnonzero(bordes == 1)
+    finales = np.flatnonzero(bordes == -1) - 1
+
+    return list(zip(inicios, finales))
+
+
+def rangoDias(fecha_inicio, fecha_final):
+    """
+    Devuelve todos los días entre dos fechas, ambas inclusive, como datetime64[D].
+    """
+    return np.arange(aFechaDia(fecha_inicio), aFechaDia(fecha_final) + 1, dtype='datetime64[D]')
+
+
+def tramosFaltantes(series, dias, variables):
+    """
+    Devuelve los tramos de días que faltan en las series almacenadas como tuplas
+    (desde, hasta, variables), con las fechas en AAAA-MM-DD. Cada tramo contiguo
+    incluye solo las variables a las que les falta algún día dentro de él.
+    """
+    # Matriz variable x día con los valores que faltan en disco
+    faltan = np.zeros((len(variables), len(dias)), dtype=bool)
+    for k, variable in enumerate(variables):
+        fechas = series[variable]['date'].to_numpy(dtype='datetime64[D]')
+        faltan[k] = ~np.isin(dias, fechas)
+
+    return [(str(dias[i]), str(dias[f]), [v for k, v in enumerate(variables) if faltan[k, i:f + 1].any()])
+            for i, f in tramosContiguos(faltan.any(axis=0))]
+
+
+def incorporarDescarga(lat, lng, series, nuevos, variables):
+    """
+    Agrega a las series (y guarda en disco) los valores descargados de cada variable.
+    Solo se guardan valores válidos: los días aún sin datos se volverán a pedir en la
+    próxima consulta.
+    """
+    for variable in variables:
+        nueva = nuevos[['date', variable]].dropna(subset=[variable])
+        if series[variable].empty:
+            combinada = nueva.reset_index(drop=True)
+        else:
+            combinada = pd.concat([series[variable], nueva], ignore_index=True)
+            combinada = combinada.drop_duplicates(subset='date', keep='last')
+            combinada = combinada.sort_values('date', ignore_index=True)
+        series[variable] = combinada
+        guardarSerie(lat, lng, variable, combinada)
+
+
+def armarResultado(series, dias, variables):
+    """
+    Arma un DataFrame con todos los días pedidos y una columna por variable.
+    """
+    fechas = pd.DatetimeIndex(dias.astype('datetime64[ns]'))
+    resultado = pd.DataFrame({'date': fechas})
+    for variable in variables:
+        serie = series[variable].set_index('date')[variable]
+        resultado[variable] = serie.reindex(fechas).to_numpy()
+
+    return resultado
+
+
+def faltantesUbicacion(lat, lng, fecha_inicio, fecha_final, variables):
+    """
+    Devuelve los tramos (desde, hasta, variables) que faltan en disco para una ubicación.
+    """
+    with bloqueoUbicacion(lat, lng):
+        series = {variable: leerSerie(lat, lng, variable) for variable in variables}
+
+    return tramosFaltantes(series, rangoDias(fecha_inicio, fecha_final), variables)
+
+
+def guardarDescarga(lat, lng, nuevos, variables):
+    """
+    Incorpora al almacén los datos descargados de una ubicación, releyendo las series
+    dentro del bloqueo para no perder lo guardado por otra sesión mientras tanto.
+    """
+    if nuevos is None or nuevos.empty:
+        return
+
+    with bloqueoUbicacion(lat, lng):
+        series = {variable: leerSerie(lat, lng, variable) for variable in variables}
+        incorporarDescarga(lat, lng, series, nuevos, variables)
+
+
+def leerRango(lat, lng, fecha_inicio, fecha_final, variables):
+    """
+    Lee del almacén las series de una ubicación para todos los días de un rango;
+    los días sin datos quedan nulos.
+    """
+    with bloqueoUbicacion(lat, lng):
+        series = {variable: leerSerie(lat, lng, variable) for variable in variables}
+
+    return armarResultado(series, rangoDias(fecha_inicio, fecha_final), variables)
+
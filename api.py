@@ -11,36 +11,215 @@ mediantes apis y enviar un dataframe
 
 import openmeteo_requests
 import requests_cache
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from retry_requests import retry
 import requests
-import json
-from datetime import datetime, timezone as tmz
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
 import utils as util
+import almacen
+import cache
+import catalogo
+import planificador
+import programador
+import metricas
+import climatologia
 import pytz
-from timezonefinder import TimezoneFinder
+
+# Vencimiento de las respuestas según el servicio consultado: el historial no
+# cambia y se conserva siempre, el pronóstico se renueva con cada actualización
+REGLAS_CACHE = [
+    (r"/v1/archive", None),
+    (r"/v1/forecast", cache.vencimientoPronostico),
+]
+
+# Vencimiento de las respuestas del archivo en la caché HTTP: los datos diarios
+# quedan en el almacén local, la caché solo evita repetir descargas cercanas
+VENCIMIENTO_CACHE_ARCHIVO = timedelta(days=7)
 
 # Inicialización del cliente Open-Meteo
 # Se configura el sistema de caché para optimizar las solicitudes y reducir llamadas redundantes
-cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
+cache_session = requests_cache.CachedSession(
+    '.cache',
+    expire_after=requests_cache.DO_NOT_CACHE,
+    urls_expire_after={
+        '*/v1/archive': VENCIMIENTO_CACHE_ARCHIVO,
+    },
+)
 retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+
+# Límite de solicitudes por servicio (patrón, llamadas por segundo, ráfaga máxima),
+# compartido por todas las sesiones y procesos; 10 llamadas por segundo entre
+# ambos servicios equivalen al límite gratuito de 600 por minuto de Open-Meteo
+LIMITES_SOLICITUDES = [
+    (r"/v1/archive", 5, 50),
+    (r"/v1/forecast", 5, 50),
+]
+programador_api = programador.Programador(LIMITES_SOLICITUDES)
+
+
+
+def programarSesion(sesion):
+    """
+    Hace pasar por el programador las solicitudes de una sesión del archivo que salen
+    a la red (no las que responde la caché) y cuenta sus respuestas y bytes.
+    """
+    for prefijo in ("https://", "http://"):
+        sesion.mount(prefijo, programador.AdaptadorProgramado(
+            programador_api, max_retries=sesion.get_adapter(prefijo).max_retries))
+    sesion.hooks["response"].append(metricas.ganchoRespuestas("archivo"))
+
+    return sesion
+
+
+openmeteo = openmeteo_requests.Client(session=programarSesion(retry_session))
+
+# Cliente sin caché HTTP para las respuestas que no deben guardarse: las que incluyen
+# días que el archivo todavía puede no haber publicado
+openmeteo_directo = openmeteo_requests.Client(
+    session=programarSesion(retry(requests.Session(), retries=5, backoff_factor=0.2)))
+
+# Días de demora con que el archivo publica los datos: las respuestas que llegan
+# hasta este margen pueden traer días sin datos que se completan más adelante
+RETRASO_ARCHIVO_DIAS = 7
 
 # URL base para la API de datos históricos de Open-Meteo
 url = "https://archive-api.open-meteo.com/v1/archive"
 
-def obtenerTemperaturaActual(lat, lng):
+# URL base para la API de pronóstico de Open-Meteo
+url_pronostico = "https://api.open-meteo.com/v1/forecast"
+ZONA_HORARIA = 'America/Sao_Paulo'
+
+# Límites del cliente de pronóstico: tiempo de espera (conexión, lectura) en segundos
+# y cantidad máxima de solicitudes simultáneas
+TIEMPO_ESPERA = (3.05, 10)
+MAX_CONCURRENCIA = 50
+
+# Variables diarias y horarias que se obtienen por defecto del historial (ver catalogo.py)
+VARIABLES_DIARIAS = catalogo.variablesDe("diaria")
+VARIABLES_HORARIAS = catalogo.variablesDe("horaria")
+
+# Cantidad máxima de coordenadas por solicitud en las descargas múltiples
+UBICACIONES_POR_SOLICITUD = planificador.MAX_UBICACIONES
+
+
+def crearSesionPronostico():
     """
-    Obtiene la temperatura actual y pronóstico horario para una ubicación específica.
+    Crea una sesión HTTP con conexiones reutilizables y reintentos para la API de pronóstico,
+    limitada por el programador de solicitudes.
+    """
+    reintentos = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                       allowed_methods=["GET"])
+    adaptador = programador.AdaptadorProgramado(programador_api, pool_connections=4,
+                                                pool_maxsize=MAX_CONCURRENCIA, max_retries=reintentos)
+
+    sesion = requests.Session()
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    sesion.hooks["response"].append(metricas.ganchoRespuestas("pronostico"))
+
+    return sesion
+
+
+sesion_pronostico = crearSesionPronostico()
+
+# Caché en memoria de los pronósticos, compartida por todas las sesiones del proceso
+cache_pronosticos = cache.CacheTTL(REGLAS_CACHE, max_entradas=512)
+
+# Paso de la grilla (grados) a la que se ajustan las coordenadas del pronóstico: cada
+# punto se corre como mucho unos 5 km, menos que la resolución de los modelos globales
+PASO_GRILLA = 0.1
+
+# Renovación en segundo plano de los pronósticos de las ciudades más consultadas
+CIUDADES_RENOVADAS = 20
+INTERVALO_RENOVACION = 60
+
+
+def ajustarGrilla(lat, lng, paso=PASO_GRILLA):
+    """
+    Ajusta unas coordenadas al punto más cercano de la grilla del pronóstico.
+    """
+    decimales = max(0, -int(np.floor(np.log10(paso))))
+
+    return (round(round(float(lat) / paso) * paso, decimales),
+            round(round(float(lng) / paso) * paso, decimales))
+
+
+def parametrosPronostico(lat, lng):
     """
-    timezone_str = 'America/Sao_Paulo'
+    Arma los parámetros del pronóstico del punto de la grilla más cercano a las
+    coordenadas, y la clave con la que se guarda (la URL de la solicitud).
+    """
+    lat, lng = ajustarGrilla(lat, lng)
+    params = {
+        "latitude": lat,
+        "longitude": lng,
+        "current_weather": "true",
+        "hourly": "temperature_2m,precipitation",
+        "timezone": ZONA_HORARIA
+    }
+
+    return params, requests.Request("GET", url_pronostico, params=params).prepare().url
+
+
+def descargarPronostico(lat, lng, forzar=False):
+    """
+    Descarga el clima actual y el pronóstico horario en formato JSON. Las respuestas
+    se reutilizan hasta la próxima actualización del modelo; con `forzar` se
+    descarga de nuevo.
+    """
+    params, clave = parametrosPronostico(lat, lng)
+    if not forzar:
+        encontrado, resultado = cache_pronosticos.obtener(clave)
+        if encontrado:
+            return resultado
+
+    @metricas.medir("api.descargarPronostico.red")
+    def descargar():
+        response = sesion_pronostico.get(url_pronostico, params=params, timeout=TIEMPO_ESPERA)
+        response.raise_for_status()
 
-    response_current = requests.get(
-        f'https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lng}'
-        f'&current_weather=true&hourly=temperature_2m,precipitation&timezone={timezone_str}'
-    )
-    result_current = json.loads(response_current._content)
-    current = result_current["current_weather"]
+        # Se guarda antes de liberar a las sesiones que esperan la misma descarga
+        resultado = response.json()
+        cache_pronosticos.guardar(clave, resultado)
+
+        return resultado
+
+    # Las sesiones que piden la misma celda a la vez comparten una sola descarga
+    return programador_api.agrupar(clave, descargar)
+
+
+def renovarPronostico(lat, lng):
+    """
+    Descarga de nuevo el pronóstico de una celda en el carril masivo, para no
+    demorar las solicitudes de la interfaz.
+    """
+    with programador_api.prioridad(programador.MASIVA):
+        descargarPronostico(lat, lng, forzar=True)
+
+
+renovador_pronosticos = cache.Renovador(cache_pronosticos, renovarPronostico, CIUDADES_RENOVADAS,
+                                        INTERVALO_RENOVACION)
+
+
+def iniciarRenovador():
+    """
+    Inicia, una sola vez por proceso, la renovación en segundo plano de los
+    pronósticos más consultados.
+    """
+    return renovador_pronosticos.iniciar()
+
+
+@metricas.medir()
+def procesarPronostico(result_current):
+    """
+    Separa el clima actual y arma el DataFrame con el pronóstico horario.
+    """
+    current = dict(result_current["current_weather"])
     current["common_dir"] = util.obtenerDireccionViento(current["winddirection"])
 
     # Procesamiento de datos horarios
@@ -52,7 +231,7 @@ def obtenerTemperaturaActual(lat, lng):
         'precipitation': 'Precipitacion mm'
     }, inplace=True)
 
-    timezone_loc = pytz.timezone(timezone_str)
+    timezone_loc = pytz.timezone(ZONA_HORARIA)
     dt = datetime.now()
     tzoffset = timezone_loc.utcoffset(dt)
 
@@ -63,68 +242,352 @@ def obtenerTemperaturaActual(lat, lng):
     return current, hourly_df
 
 
-def obtenerTemperaturaHistorica(lat, lng, fecha_inicio, fecha_final):
+@metricas.medir()
+def obtenerTemperaturaActual(lat, lng):
+    """
+    Obtiene la temperatura actual y pronóstico horario para una ubicación específica.
+    Cada consulta cuenta como visita para la renovación en segundo plano.
+    """
+    params, clave = parametrosPronostico(lat, lng)
+    renovador_pronosticos.registrarVisita(clave, params["latitude"], params["longitude"])
+
+    return procesarPronostico(descargarPronostico(lat, lng))
+
+
+def limpiarCacheHttp():
+    """
+    Elimina de la caché HTTP las respuestas vencidas. Escribe en disco, por lo que se
+    ejecuta como paso de mantenimiento y no al importar el módulo.
+    """
+    cache_session.cache.delete(expired=True)
+
+
+def estadisticasCache():
+    """
+    Devuelve los contadores de la caché de pronósticos.
+    """
+    return cache_pronosticos.estadisticas()
+
+
+def estadisticasRenovador():
+    """
+    Devuelve los contadores de la renovación de los pronósticos más consultados.
+    """
+    return renovador_pronosticos.estadisticas()
+
+
+def estadisticasProgramador():
+    """
+    Devuelve la profundidad de las colas y los contadores del programador de solicitudes.
+    """
+    return programador_api.estadisticas()
+
+
+def ultimoDiaArchivado():
+    """
+    Devuelve el último día anterior a los que el archivo puede no haber publicado todavía.
+    """
+    return date.today() - timedelta(days=RETRASO_ARCHIVO_DIAS + 1)
+
+
+def archivoReciente(fecha_final):
+    """
+    Indica si un rango que termina en `fecha_final` llega a los días que el archivo
+    puede no haber publicado todavía.
+    """
+    return pd.Timestamp(fecha_final).date() > ultimoDiaArchivado()
+
+
+def consultarArchivo(params, cache=True):
+    """
+    Consulta la API de archivo. Las consultas idénticas que están en curso al mismo
+    tiempo (mismas coordenadas, fechas y variables) comparten una sola llamada. Las
+    que llegan a los días recientes no se guardan en la caché HTTP, para que los días
+    aún sin publicar se vuelvan a pedir y se completen cuando estén disponibles; con
+    `cache` False no se guarda ninguna.
+    """
+    clave = requests.Request("GET", url, params=params).prepare().url
+    usar_cache = cache and not archivoReciente(params["end_date"])
+    cliente = openmeteo if usar_cache else openmeteo_directo
+
+    return programador_api.agrupar(clave, metricas.medir("api.consultarArchivo.red")(
+        lambda: cliente.weather_api(url, params=params)))
+
+
+def obtenerTemperaturaActualMultiple(ubicaciones, max_concurrencia=MAX_CONCURRENCIA):
+    """
+    Obtiene la temperatura actual y el pronóstico horario de varias ubicaciones (lat, lng)
+    en paralelo, reutilizando las conexiones de la sesión.
+    Devuelve una lista de tuplas (current, hourly_df) en el mismo orden de las ubicaciones.
+    """
+    ubicaciones = list(ubicaciones)
+    if not ubicaciones:
+        return []
+
+    hilos = max(1, min(max_concurrencia, MAX_CONCURRENCIA, len(ubicaciones)))
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        return list(executor.map(lambda ubicacion: obtenerTemperaturaActual(*ubicacion), ubicaciones))
+
+
+def obtenerAnomaliasPronostico(ubicaciones, umbral=climatologia.UMBRAL_Z):
+    """
+    Compara el pronóstico de varias ubicaciones (lat, lng) con la climatología guardada
+    de cada una. Las ubicaciones sin historial almacenado se omiten. Devuelve el
+    resumen diario con los puntajes z y la posición de cada ubicación en la lista.
+    """
+    ubicaciones = list(ubicaciones)
+    climas = {}
+    for i, (lat, lng) in enumerate(ubicaciones):
+        clima = climatologia.obtenerClimatologia(lat, lng)
+        if clima is not None:
+            climas[i] = clima
+
+    if not climas:
+        return pd.DataFrame()
+
+    pronosticos = obtenerTemperaturaActualMultiple([ubicaciones[i] for i in climas])
+    horario = pd.concat([hourly_df.assign(ubicacion=i)
+                         for i, (_, hourly_df) in zip(climas, pronosticos)], ignore_index=True)
+
+    resultado = climatologia.anomaliasPronostico(horario, climas, umbral)
+    resultado['latitude'] = resultado['ubicacion'].map(lambda i: ubicaciones[i][0])
+    resultado['longitude'] = resultado['ubicacion'].map(lambda i: ubicaciones[i][1])
+
+    return resultado
+
+
+def fechasSeccion(seccion, offset):
+    """
+    Calcula las fechas locales sin zona horaria de una sección como datetime64,
+    directamente desde los segundos de inicio, fin e intervalo.
+    """
+    segundos = np.arange(seccion.Time() + offset, seccion.TimeEnd() + offset, seccion.Interval(),
+                         dtype=np.int64)
+
+    return segundos.astype('datetime64[s]').astype('datetime64[ns]')
+
+
+def valoresSeccion(seccion, variables, cantidad):
+    """
+    Devuelve un diccionario {variable: array float32} con vistas de solo lectura sobre
+    el buffer de la respuesta, sin copiar los valores. Las variables llegan en el
+    mismo orden en que fueron pedidas; si alguna no vino se completa con nulos.
+    """
+    valores = {}
+    for i, variable in enumerate(variables):
+        array = seccion.Variables(i).ValuesAsNumpy() if i < seccion.VariablesLength() else None
+        if not isinstance(array, np.ndarray):
+            array = np.full(cantidad, np.nan, dtype=np.float32)
+        valores[variable] = array
+
+    return valores
+
+
+@metricas.medir()
+def procesarSeccion(seccion, offset, variables, formato="pandas", copiar=True):
+    """
+    Convierte una sección de la respuesta (diaria u horaria) en un DataFrame, o en una
+    tabla de Arrow con formato "arrow", con la columna 'date' como datetime64 local y
+    una columna float32 por variable. Las fechas no se convierten a texto: el formato
+    de salida se aplica solo al exportar. Con `copiar` en False las columnas son vistas
+    de solo lectura sobre la respuesta, para los usos internos que no las modifican.
+    """
+    fechas = fechasSeccion(seccion, offset)
+    valores = valoresSeccion(seccion, variables, len(fechas))
+
+    if formato == "arrow":
+        return pa.table({"date": pa.array(fechas), **{v: pa.array(a) for v, a in valores.items()}})
+    elif formato != "pandas":
+        raise ValueError(f"Formato desconocido: {formato}")
+
+    return pd.DataFrame({"date": fechas, **valores}, copy=copiar)
+
+
+def procesarRespuestaDiaria(response, variables, formato="pandas", copiar=True):
+    """
+    Convierte la sección diaria de una respuesta de la API en un DataFrame.
+    """
+    daily = response.Daily()
+    if not daily:
+        return None
+
+    return procesarSeccion(daily, response.UtcOffsetSeconds(), variables, formato, copiar)
+
+
+def procesarRespuestaHoraria(response, variables, formato="pandas", copiar=True):
+    """
+    Convierte la sección horaria de una respuesta de la API en un DataFrame.
+    """
+    hourly = response.Hourly()
+    if not hourly:
+        return None
+
+    return procesarSeccion(hourly, response.UtcOffsetSeconds(), variables, formato, copiar)
+
+
+def descargarHistoricoMultiple(ubicaciones, fecha_inicio, fecha_final, variables=VARIABLES_DIARIAS,
+                               formato="largo", por_solicitud=UBICACIONES_POR_SOLICITUD, copiar=True):
+    """
+    Descarga el historial diario de varias ubicaciones (lat, lng) agrupándolas en
+    solicitudes de hasta `por_solicitud` coordenadas cada una. Con `copiar` en False
+    los DataFrames son de solo lectura (ver procesarSeccion).
+
+    Con formato "largo" devuelve un único DataFrame con las columnas 'ubicacion',
+    'latitude' y 'longitude'; con formato "dict" devuelve un diccionario
+    {(lat, lng): DataFrame}.
+    """
+    if formato not in ("largo", "dict"):
+        raise ValueError(f"Formato desconocido: {formato}")
+
+    ubicaciones = [(float(lat), float(lng)) for lat, lng in ubicaciones]
+    resultados = {}
+
+    for inicio in range(0, len(ubicaciones), por_solicitud):
+        lote = ubicaciones[inicio:inicio + por_solicitud]
+        params = {
+            "latitude": [lat for lat, _ in lote],
+            "longitude": [lng for _, lng in lote],
+            "start_date": fecha_inicio,
+            "end_date": fecha_final,
+            "daily": variables,
+            "timezone": ZONA_HORARIA
+        }
+
+        # La API devuelve una respuesta por coordenada, en el mismo orden del pedido
+        responses = consultarArchivo(params)
+        if len(responses) != len(lote):
+            raise ValueError(f"Se esperaban {len(lote)} respuestas y se recibieron {len(responses)}")
+
+        for ubicacion, response in zip(lote, responses):
+            resultados[ubicacion] = procesarRespuestaDiaria(response, variables, copiar=copiar)
+
+    if formato == "dict":
+        return resultados
+
+    frames = []
+    for (lat, lng), df in resultados.items():
+        if df is None:
+            continue
+        df.insert(0, "ubicacion", almacen.claveUbicacion(lat, lng))
+        df.insert(1, "latitude", lat)
+        df.insert(2, "longitude", lng)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["ubicacion", "latitude", "longitude", "date", *variables])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def descargarLoteDiario(ubicaciones, fecha_inicio, fecha_final, variables):
+    """
+    Descarga en una sola solicitud el historial diario de varias ubicaciones y
+    devuelve la lista de DataFrames en el mismo orden. Como solo se guardan en el
+    almacén, los DataFrames son vistas de solo lectura sobre la respuesta.
+    """
+    resultados = descargarHistoricoMultiple(ubicaciones, fecha_inicio, fecha_final, variables,
+                                            formato="dict", por_solicitud=len(ubicaciones), copiar=False)
+
+    return [resultados[(float(lat), float(lng))] for lat, lng in ubicaciones]
+
+
+@metricas.medir()
+def obtenerHistorial(ubicaciones, fecha_inicio, fecha_final, variables=VARIABLES_DIARIAS, formato="largo"):
+    """
+    Obtiene el historial diario de varias ubicaciones (lat, lng) con solo las variables
+    pedidas. Lo ya almacenado se lee de disco y lo faltante se descarga en solicitudes
+    agrupadas y divididas según los límites de la API (ver planificador.py). En el
+    carril masivo las solicitudes se achican para no tocar la reserva de la interfaz.
+    """
+    variables = catalogo.validarVariables(variables, "diaria")
+
+    return planificador.obtenerHistorial(ubicaciones, fecha_inicio, fecha_final, variables,
+                                         descargarLoteDiario, formato,
+                                         max_peso=programador_api.pesoMaximo(url))
+
+
+@metricas.medir()
+def obtenerTemperaturaHistorica(lat, lng, fecha_inicio, fecha_final, variables=VARIABLES_DIARIAS):
     """
     Obtiene datos históricos de temperatura y condiciones meteorológicas para un período específico.
+    Los días ya descargados se leen del almacén local y solo se piden a la API los faltantes.
+    La columna 'date' se devuelve como datetime64; el formato de texto se aplica al exportar.
     """
-    params = {
-        "latitude": lat,
-        "longitude": lng,
-        "start_date": fecha_inicio,
-        "end_date": fecha_final,
-        "daily": [
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "temperature_2m_mean",
-            "daylight_duration",
-            "sunshine_duration",
-            "precipitation_sum",
-            "wind_speed_10m_max",
-            "shortwave_radiation_sum"
-        ],
-        "timezone": "America/Sao_Paulo"
-    }
+    resultados = obtenerHistorial([(lat, lng)], fecha_inicio, fecha_final, variables, formato="dict")
+
+    return next(iter(resultados.values()))
+
+
+def dividirPeriodo(fecha_inicio, fecha_final, frecuencia="MS"):
+    """
+    Divide un período en tramos consecutivos que comienzan en cada inicio de mes
+    ("MS") o de año ("YS"). Devuelve una lista de tuplas (desde, hasta) en formato
+    AAAA-MM-DD, ambos inclusive.
+    """
+    inicio, fin = pd.Timestamp(fecha_inicio).normalize(), pd.Timestamp(fecha_final).normalize()
+    cortes = pd.date_range(inicio, fin, freq=frecuencia)
+    inicios = [inicio, *[corte for corte in cortes if corte > inicio]]
+    finales = [siguiente - pd.Timedelta(days=1) for siguiente in inicios[1:]] + [fin]
+
+    return [(desde.strftime('%Y-%m-%d'), hasta.strftime('%Y-%m-%d'))
+            for desde, hasta in zip(inicios, finales)]
+
+
+def obtenerHistoricoHorario(lat, lng, fecha_inicio, fecha_final, variables=VARIABLES_HORARIAS,
+                            frecuencia="MS", formato="pandas", copiar=True):
+    """
+    Descarga el historial horario por tramos mensuales ("MS") o anuales ("YS") y
+    devuelve un generador con un DataFrame (o tabla de Arrow) por tramo, de modo que
+    en memoria solo se mantiene un tramo a la vez. Los tramos no pasan por la caché
+    HTTP, que de otro modo guardaría todo el historial horario en disco. Con `copiar`
+    en False los DataFrames son de solo lectura (ver procesarSeccion).
+    """
+    for desde, hasta in dividirPeriodo(fecha_inicio, fecha_final, frecuencia):
+        params = {
+            "latitude": lat,
+            "longitude": lng,
+            "start_date": desde,
+            "end_date": hasta,
+            "hourly": variables,
+            "timezone": ZONA_HORARIA
+        }
+
+        responses = consultarArchivo(params, cache=False)
+        if not responses:
+            print(f"No se recibieron respuestas de la API para {desde} - {hasta}.")
+            continue
+
+        tramo = procesarRespuestaHoraria(responses[0], variables, formato, copiar)
+        if tramo is not None:
+            yield tramo
+
+
+def guardarHistoricoHorario(lat, lng, fecha_inicio, fecha_final, ruta, variables=VARIABLES_HORARIAS,
+                            frecuencia="MS"):
+    """
+    Descarga el historial horario por tramos y los agrega a un archivo a medida que
+    llegan: Parquet (un grupo de filas por tramo) o CSV, según la extensión de `ruta`.
+    Devuelve la cantidad de filas escritas.
+    """
+    filas = 0
+    escritor = None
+    es_parquet = ruta.endswith(".parquet")
+
+    # Para Parquet los tramos se decodifican directamente como tablas de Arrow
+    tramos = obtenerHistoricoHorario(lat, lng, fecha_inicio, fecha_final, variables, frecuencia,
+                                     formato="arrow" if es_parquet else "pandas", copiar=False)
+    try:
+        for tramo in tramos:
+            if es_parquet:
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tramo.schema)
+                escritor.write_table(tramo)
+            else:
+                tramo.to_csv(ruta, mode="w" if filas == 0 else "a", header=filas == 0, index=False)
+
+            filas += len(tramo)
+    finally:
+        if escritor is not None:
+            escritor.close()
 
-     # Realizar solicitud a la API
-    responses = openmeteo.weather_api(url, params=params)
-
-    # Verificar si hay una respuesta y procesarla
-    if responses:
-        response = responses[0]
-
-        # Procesamiento de datos diarios
-        daily = response.Daily()
-        if daily:
-            daily_temperature_2m_max = daily.Variables(0).ValuesAsNumpy()
-            daily_temperature_2m_min = daily.Variables(1).ValuesAsNumpy()
-            daily_temperature_2m_mean = daily.Variables(2).ValuesAsNumpy()
-            daily_daylight_duration = daily.Variables(3).ValuesAsNumpy()
-            daily_sunshine_duration = daily.Variables(4).ValuesAsNumpy()
-            daily_precipitation_sum = daily.Variables(5).ValuesAsNumpy()
-            daily_wind_speed_10m_max = daily.Variables(6).ValuesAsNumpy()
-            daily_shortwave_radiation_sum = daily.Variables(7).ValuesAsNumpy()
-
-            daily_data = {"date": pd.date_range(
-                start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-                end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=daily.Interval()),
-                inclusive="left"
-            )}
-            
-            daily_data["temperature_2m_max"] = daily_temperature_2m_max
-            daily_data["temperature_2m_min"] = daily_temperature_2m_min
-            daily_data["temperature_2m_mean"] = daily_temperature_2m_mean
-            daily_data["daylight_duration"] = daily_daylight_duration
-            daily_data["sunshine_duration"] = daily_sunshine_duration
-            daily_data["precipitation_sum"] = daily_precipitation_sum
-            daily_data["wind_speed_10m_max"] = daily_wind_speed_10m_max
-            daily_data["shortwave_radiation_sum"] = daily_shortwave_radiation_sum
-
-            # Crear un dataframe
-            daily_dataframe = pd.DataFrame(data=daily_data)
-            daily_dataframe['date'] = daily_dataframe['date'].dt.strftime('%d/%m/%Y')
-
-            return daily_dataframe
-
-    else:
-        print("No se recibieron respuestas de la API.")
+    return filas
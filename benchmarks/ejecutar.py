@@ -0,0 +1,357 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo ejecuta las mediciones de rendimiento de la aplicación sin acceder
+a Open-Meteo: la API se redirige a un servidor falso local con latencia
+configurable. Cubre la descarga y decodificación del historial y del
+pronóstico, la carga de archivos de historial de tamaño creciente (generados a
+partir del CSV de Córdoba incluido en el repositorio), las estadísticas y cada
+uno de los gráficos. Para cada caso informa la latencia (mediana y p95), el
+rendimiento y el pico de memoria medido con tracemalloc.
+
+Ejemplos:
+    python benchmarks/ejecutar.py
+    python benchmarks/ejecutar.py --latencia 0.05 --grupo historial --grupo pronostico
+    python benchmarks/ejecutar.py --salida base.json
+    python benchmarks/ejecutar.py --comparar base.json --tolerancia 0.2
+    python benchmarks/ejecutar.py --grupo graficos --perfil pilas.txt
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+DIR_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DIR_PROYECTO = os.path.dirname(DIR_BENCHMARKS)
+sys.path.insert(0, DIR_PROYECTO)
+
+from servidor_falso import ServidorFalso  # noqa: E402
+
+# Historial real usado como semilla de los archivos de prueba
+ARCHIVO_SEMILLA = os.path.join(DIR_PROYECTO, 'Argentina_Cordoba_2020-01-01_2024-10-27.csv')
+
+# Ubicación de referencia (Córdoba, Argentina)
+LAT, LNG = -31.4167, -64.1833
+
+GRUPOS = ['historial', 'pronostico', 'cargador', 'estadisticas', 'graficos']
+
+
+def medir(nombre, funcion, repeticiones, unidades=1, unidad='op', preparar=None):
+    """
+    Mide un caso: una ejecución de calentamiento, `repeticiones` ejecuciones
+    cronometradas y una última con tracemalloc para el pico de memoria (se mide
+    aparte porque tracemalloc enlentece la ejecución). `preparar` se llama antes
+    de cada ejecución, fuera del tiempo medido.
+    """
+    def ejecutar():
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        return time.perf_counter() - inicio
+
+    ejecutar()
+    tiempos = np.array([ejecutar() for _ in range(repeticiones)])
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mediana = float(np.median(tiempos))
+
+    return {
+        'caso': nombre,
+        'repeticiones': repeticiones,
+        'mediana_ms': mediana * 1000,
+        'p95_ms': float(np.percentile(tiempos, 95)) * 1000,
+        'minimo_ms': float(tiempos.min()) * 1000,
+        'rendimiento': unidades / mediana if mediana > 0 else float('inf'),
+        'unidad': f"{unidad}/s",
+        'pico_mb': pico / 2 ** 20,
+    }
+
+
+def generarHistorial(semilla, copias):
+    """
+    Repite el historial semilla `copias` veces, corriendo las fechas de cada copia
+    para que no se superpongan.
+    """
+    semilla = semilla.copy()
+    semilla['date'] = pd.to_datetime(semilla['date'], format='%d/%m/%Y')
+    dias = len(semilla)
+
+    partes = []
+    for k in range(copias):
+        parte = semilla.copy()
+        parte['date'] = parte['date'] + pd.Timedelta(days=k * dias)
+        partes.append(parte)
+
+    return pd.concat(partes, ignore_index=True)
+
+
+def benchmarksHistorial(api, servidor, repeticiones):
+    """
+    Descarga y decodificación del historial diario y horario.
+    """
+    def limpiarCache():
+        api.cache_session.cache.clear()
+
+    def limpiarAlmacen():
+        limpiarCache()
+        shutil.rmtree(api.almacen.DIR_HISTORIAL, ignore_errors=True)
+
+    ubicaciones = [(LAT + i * 0.1, LNG + i * 0.1) for i in range(50)]
+
+    def historicoHorario():
+        return sum(len(tramo) for tramo in api.obtenerHistoricoHorario(LAT, LNG, '2023-01-01', '2023-12-31'))
+
+    return [
+        medir("historial: descarga y decodificación de 1 año",
+              lambda: api.obtenerTemperaturaHistorica(LAT, LNG, '2023-01-01', '2023-12-31'),
+              repeticiones, 365, 'días', preparar=limpiarAlmacen),
+        medir("historial: 5 años con almacén vacío",
+              lambda: api.obtenerTemperaturaHistorica(LAT, LNG, '2020-01-01', '2024-12-31'),
+              repeticiones, 1827, 'días', preparar=limpiarAlmacen),
+        medir("historial: 5 años desde el almacén",
+              lambda: api.obtenerTemperaturaHistorica(LAT, LNG, '2020-01-01', '2024-12-31'),
+              repeticiones, 1827, 'días'),
+        medir("historial: 50 ubicaciones de 1 año",
+              lambda: api.descargarHistoricoMultiple(ubicaciones, '2023-01-01', '2023-12-31'),
+              repeticiones, 50 * 365, 'filas', preparar=limpiarCache),
+        medir("historial horario: 1 año por meses",
+              historicoHorario, repeticiones, 365 * 24, 'horas', preparar=limpiarCache),
+    ]
+
+
+def benchmarksPronostico(api, servidor, repeticiones):
+    """
+    Descarga y procesamiento del pronóstico, con y sin caché.
+    """
+    ubicaciones = [(LAT + i * 0.1, LNG) for i in range(100)]
+    limpiar = api.cache_pronosticos.limpiar
+
+    return [
+        medir("pronóstico: 1 ubicación",
+              lambda: api.obtenerTemperaturaActual(LAT, LNG),
+              repeticiones, 1, 'solicitudes', preparar=limpiar),
+        medir("pronóstico: 1 ubicación desde la caché",
+              lambda: api.obtenerTemperaturaActual(LAT, LNG),
+              repeticiones, 1, 'solicitudes'),
+        medir("pronóstico: 100 ubicaciones en paralelo",
+              lambda: api.obtenerTemperaturaActualMultiple(ubicaciones),
+              repeticiones, 100, 'ubicaciones', preparar=limpiar),
+    ]
+
+
+def benchmarksCargador(utils, directorio, repeticiones, tamanos):
+    """
+    Carga de archivos de historial de tamaño creciente en CSV y Parquet.
+    """
+    semilla = pd.read_csv(ARCHIVO_SEMILLA)
+    resultados = []
+
+    for copias in tamanos:
+        historial = generarHistorial(semilla, copias)
+        desde = historial['date'].min().date()
+        hasta = historial['date'].max().date()
+        base = os.path.join(directorio, f"Argentina_Cordoba_{desde}_{hasta}")
+
+        historial.to_csv(f"{base}.csv", index=False, date_format='%d/%m/%Y')
+        historial.to_parquet(f"{base}.parquet", index=False)
+
+        for extension in ('csv', 'parquet'):
+            ruta = f"{base}.{extension}"
+            resultados.append(medir(
+                f"cargador: {extension} de {len(historial)} filas",
+                lambda ruta=ruta: utils.cargarHistorialDesdeArchivos([ruta]),
+                repeticiones, len(historial), 'filas'))
+
+    return resultados
+
+
+def benchmarksEstadisticas(utils, directorio, repeticiones):
+    """
+    Preparación de datos, estadísticas, índices y resumen diario.
+    """
+    import diario
+    import estadisticas
+    import indices
+
+    historial = generarHistorial(pd.read_csv(ARCHIVO_SEMILLA), 10)
+    historial['date'] = historial['date'].dt.strftime('%d/%m/%Y')
+    preparado = utils.prepararDatos(historial)
+
+    ruta_csv = os.path.join(directorio, 'estadisticas.csv')
+    historial.to_csv(ruta_csv, index=False)
+
+    # Pronósticos horarios de 1000 ubicaciones para el resumen diario
+    horas = pd.date_range('2024-10-01', periods=168, freq='h')
+    rng = np.random.default_rng(0)
+    pronosticos = pd.DataFrame({
+        'ubicacion': np.repeat(np.arange(1000), len(horas)),
+        'Fecha': np.tile(horas, 1000),
+        'Temperatura °C': rng.normal(20, 6, 1000 * len(horas)),
+        'Precipitacion mm': rng.exponential(0.2, 1000 * len(horas)),
+    })
+
+    return [
+        medir("estadísticas: preparación de datos",
+              lambda: utils.prepararDatos(historial),
+              repeticiones, len(historial), 'filas', preparar=utils._prepararDatos.clear),
+        medir("estadísticas: obtenerDatosEstadisticos",
+              lambda: utils.obtenerDatosEstadisticos(preparado),
+              repeticiones, len(preparado), 'filas'),
+        medir("estadísticas: en streaming desde CSV",
+              lambda: estadisticas.estadisticasEnStreaming(ruta_csv).resultado(),
+              repeticiones, len(historial), 'filas'),
+        medir("estadísticas: índices agroclimáticos",
+              lambda: indices.calcularIndices(preparado, LAT),
+              repeticiones, len(preparado), 'filas'),
+        medir("estadísticas: resumen diario de 1000 pronósticos",
+              lambda: diario.resumirPorDia(pronosticos, utils.AGREGACIONES_DIARIAS, claves=['ubicacion']),
+              repeticiones, len(pronosticos), 'filas'),
+    ]
+
+
+def benchmarksGraficos(utils, api, repeticiones):
+    """
+    Generación y codificación a PNG de cada gráfico (sin la caché de imágenes).
+    """
+    import matplotlib.pyplot as plt
+
+    preparado = utils.prepararDatos(pd.read_csv(ARCHIVO_SEMILLA))
+    _, pronostico = api.obtenerTemperaturaActual(LAT, LNG)
+
+    def renderizar(funcion, df):
+        fig = funcion(df)
+        try:
+            fig.savefig(io.BytesIO(), format='png', bbox_inches='tight')
+        finally:
+            plt.close(fig)
+
+    casos = [
+        ("gráficos: semanal", utils.mostrarGraficoSemanal, pronostico),
+        ("gráficos: evolución climática", utils.mostrarGraficoTemperatura, preparado),
+        ("gráficos: luz solar mensual", utils.mostrarGraficoLuz, preparado),
+        ("gráficos: luz solar y radiación", utils.mostrarGraficoRadiacion, preparado),
+    ]
+
+    return [medir(nombre, lambda f=funcion, df=df: renderizar(f, df), repeticiones, 1, 'gráficos')
+            for nombre, funcion, df in casos]
+
+
+def mostrarResultados(resultados, base=None, tolerancia=0.2):
+    """
+    Imprime la tabla de resultados. Si se indica una medición base, agrega la
+    variación de la mediana y marca las regresiones que superan la tolerancia.
+    Devuelve la cantidad de regresiones.
+    """
+    base = {r['caso']: r for r in base or []}
+    regresiones = 0
+
+    print(f"{'caso':<50} {'mediana ms':>11} {'p95 ms':>9} {'rendimiento':>22} {'pico MB':>8}")
+    for r in resultados:
+        linea = (f"{r['caso']:<50} {r['mediana_ms']:>11.2f} {r['p95_ms']:>9.2f} "
+                 f"{r['rendimiento']:>12.1f} {r['unidad']:<9} {r['pico_mb']:>8.2f}")
+        if r['caso'] in base:
+            variacion = r['mediana_ms'] / base[r['caso']]['mediana_ms'] - 1
+            linea += f" {variacion:+.0%}"
+            if variacion > tolerancia:
+                linea += " REGRESIÓN"
+                regresiones += 1
+        print(linea)
+
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento sin acceso a la red.")
+    parser.add_argument("--grupo", action="append", choices=GRUPOS,
+                        help="Grupo de casos a ejecutar (se puede repetir; por defecto todos)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--latencia", type=float, default=0.0,
+                        help="Latencia en segundos de cada respuesta del servidor falso")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1, 10, 50],
+                        help="Copias del historial de Córdoba en cada archivo del cargador")
+    parser.add_argument("--salida", help="Guarda los resultados en un archivo JSON")
+    parser.add_argument("--comparar", help="Archivo JSON de una medición anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Aumento máximo de la mediana antes de considerarlo una regresión")
+    parser.add_argument("--perfil", help="Guarda las pilas del perfilador por muestreo (formato colapsado)")
+    args = parser.parse_args(argumentos)
+    grupos = args.grupo or GRUPOS
+    perfil = os.path.abspath(args.perfil) if args.perfil else None
+
+    # Todo lo que la aplicación escribe (caché HTTP, almacén) queda en un directorio temporal
+    directorio = tempfile.mkdtemp(prefix="benchmarks_")
+    directorio_original = os.getcwd()
+    os.chdir(directorio)
+
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')  # Sin advertencias por ejecutar fuera de Streamlit
+
+    import metricas
+    if perfil:
+        metricas.perfilador.iniciar()
+
+    servidor = ServidorFalso(latencia=args.latencia).iniciar()
+    try:
+        import api
+        import utils
+        api.url = servidor.url_archivo
+        api.url_pronostico = servidor.url_pronostico
+        api.programador_api.configurarLimites([])  # El servidor falso no tiene cuota que respetar
+
+        resultados = []
+        if 'historial' in grupos:
+            resultados += benchmarksHistorial(api, servidor, args.repeticiones)
+        if 'pronostico' in grupos:
+            resultados += benchmarksPronostico(api, servidor, args.repeticiones)
+        if 'cargador' in grupos:
+            resultados += benchmarksCargador(utils, directorio, args.repeticiones, args.tamanos)
+        if 'estadisticas' in grupos:
+            resultados += benchmarksEstadisticas(utils, directorio, args.repeticiones)
+        if 'graficos' in grupos:
+            resultados += benchmarksGraficos(utils, api, args.repeticiones)
+    finally:
+        servidor.detener()
+        if perfil:
+            metricas.perfilador.detener().guardar(perfil)
+        os.chdir(directorio_original)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)['resultados']
+
+    regresiones = mostrarResultados(resultados, base, args.tolerancia)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({'latencia': args.latencia, 'resultados': resultados}, archivo,
+                      ensure_ascii=False, indent=2)
+
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
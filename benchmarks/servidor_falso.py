@@ -0,0 +1,246 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa un servidor local que imita a Open-Meteo para medir el
+rendimiento sin depender de la red: el endpoint de archivo responde en
+FlatBuffers, igual que `openmeteo.weather_api`, y el de pronóstico en JSON.
+Los valores son sintéticos pero deterministas por ubicación y variable, y la
+latencia de cada respuesta es configurable.
+
+Uso:
+    servidor = ServidorFalso(latencia=0.05).iniciar()
+    api.url = servidor.url_archivo
+    api.url_pronostico = servidor.url_pronostico
+"""
+
+import json
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import flatbuffers
+import numpy as np
+import pandas as pd
+
+# Rango de valores (mínimo, máximo) de cada variable; las demás van de 0 a 30
+RANGOS_VARIABLES = {
+    'temperature_2m': (5, 35),
+    'temperature_2m_max': (15, 38),
+    'temperature_2m_min': (-2, 22),
+    'temperature_2m_mean': (8, 28),
+    'daylight_duration': (36000, 51000),
+    'sunshine_duration': (0, 45000),
+    'precipitation': (0, 2),
+    'precipitation_sum': (0, 20),
+    'rain_sum': (0, 20),
+    'wind_direction_10m': (0, 360),
+}
+
+# Desplazamiento horario de las respuestas (America/Sao_Paulo)
+DESPLAZAMIENTO_UTC = -10800
+
+# Ranuras de las tablas FlatBuffers del esquema de Open-Meteo
+RANURAS_RESPUESTA = {'latitude': 0, 'longitude': 1, 'utc_offset_seconds': 6, 'daily': 10, 'hourly': 11}
+RANURAS_SERIE = {'time': 0, 'time_end': 1, 'interval': 2, 'variables': 3}
+RANURA_VALORES = 3
+
+
+def generarValores(variable, cantidad, lat, lng, inicio):
+    """
+    Genera valores sintéticos deterministas para una variable y ubicación a partir
+    de un instante (segundos), de modo que pedir un tramo dos veces dé lo mismo.
+    """
+    semilla = zlib.crc32(f"{variable}:{lat:.2f}:{lng:.2f}:{inicio}".encode())
+    rng = np.random.default_rng(semilla)
+    minimo, maximo = RANGOS_VARIABLES.get(variable, (0, 30))
+
+    return (minimo + rng.random(cantidad) * (maximo - minimo)).astype(np.float32)
+
+
+def _serie(builder, inicio, fin, intervalo, variables, lat, lng, limite=None):
+    """
+    Escribe una tabla VariablesWithTime con los valores de cada variable. Los
+    instantes desde `limite` (segundos) en adelante quedan nulos.
+    """
+    cantidad = (fin - inicio) // intervalo
+    tablas = []
+    for variable in variables:
+        valores = generarValores(variable, cantidad, lat, lng, inicio)
+        if limite is not None:
+            valores[inicio + np.arange(cantidad) * intervalo >= limite] = np.nan
+        vector = builder.CreateNumpyVector(valores)
+        builder.StartObject(4)
+        builder.PrependUOffsetTRelativeSlot(RANURA_VALORES, vector, 0)
+        tablas.append(builder.EndObject())
+
+    builder.StartVector(4, len(tablas), 4)
+    for tabla in reversed(tablas):
+        builder.PrependUOffsetTRelative(tabla)
+    lista = builder.EndVector()
+
+    builder.StartObject(4)
+    builder.PrependInt64Slot(RANURAS_SERIE['time'], inicio, 0)
+    builder.PrependInt64Slot(RANURAS_SERIE['time_end'], fin, 0)
+    builder.PrependInt32Slot(RANURAS_SERIE['interval'], intervalo, 0)
+    builder.PrependUOffsetTRelativeSlot(RANURAS_SERIE['variables'], lista, 0)
+
+    return builder.EndObject()
+
+
+def _instante(fecha):
+    """
+    Devuelve el instante UTC (segundos) del comienzo de un día local.
+    """
+    return int(pd.Timestamp(fecha).timestamp()) - DESPLAZAMIENTO_UTC
+
+
+def respuestaArchivo(lat, lng, fecha_inicio, fecha_final, diarias=(), horarias=(), publicado=None):
+    """
+    Arma la respuesta FlatBuffers de una ubicación, precedida por su longitud como
+    la envía la API (varias respuestas se concatenan en el mismo cuerpo). Los días
+    posteriores a `publicado` vienen sin datos, como los que el archivo aún no publicó.
+    """
+    builder = flatbuffers.Builder(1024)
+    inicio = _instante(fecha_inicio)
+    fin = _instante(pd.Timestamp(fecha_final) + pd.Timedelta(days=1))
+    limite = _instante(pd.Timestamp(publicado) + pd.Timedelta(days=1)) if publicado is not None else None
+
+    diario = _serie(builder, inicio, fin, 86400, diarias, lat, lng, limite) if diarias else None
+    horario = _serie(builder, inicio, fin, 3600, horarias, lat, lng, limite) if horarias else None
+
+    builder.StartObject(14)
+    builder.PrependFloat32Slot(RANURAS_RESPUESTA['latitude'], lat, 0)
+    builder.PrependFloat32Slot(RANURAS_RESPUESTA['longitude'], lng, 0)
+    builder.PrependInt32Slot(RANURAS_RESPUESTA['utc_offset_seconds'], DESPLAZAMIENTO_UTC, 0)
+    if diario:
+        builder.PrependUOffsetTRelativeSlot(RANURAS_RESPUESTA['daily'], diario, 0)
+    if horario:
+        builder.PrependUOffsetTRelativeSlot(RANURAS_RESPUESTA['hourly'], horario, 0)
+    builder.Finish(builder.EndObject())
+
+    cuerpo = bytes(builder.Output())
+
+    return len(cuerpo).to_bytes(4, 'little') + cuerpo
+
+
+def respuestaPronostico(lat, lng, horarias=('temperature_2m', 'precipitation'), horas=168):
+    """
+    Arma la respuesta JSON del pronóstico: clima actual y una semana de datos horarios.
+    """
+    ahora = pd.Timestamp.now().floor('D')
+    tiempos = pd.date_range(ahora, periods=horas, freq='h')
+    inicio = int(tiempos[0].timestamp())
+
+    hourly = {'time': tiempos.strftime('%Y-%m-%dT%H:%M').tolist()}
+    for variable in horarias:
+        hourly[variable] = np.round(generarValores(variable, horas, lat, lng, inicio), 1).tolist()
+
+    return {
+        'latitude': lat,
+        'longitude': lng,
+        'current_weather': {
+            'time': hourly['time'][0],
+            'temperature': hourly.get('temperature_2m', [20.0])[0],
+            'windspeed': 10.0,
+            'winddirection': 200.0,
+            'is_day': 1,
+        },
+        'hourly': hourly,
+    }
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    """
+    Atiende las solicitudes de archivo y pronóstico del servidor falso.
+    """
+
+    servidor_falso = None
+
+    def log_message(self, *args):
+        pass  # Sin registro por solicitud para no afectar las mediciones
+
+    def do_GET(self):
+        falso = self.servidor_falso
+        time.sleep(falso.latencia)
+
+        partes = urlparse(self.path)
+        consulta = parse_qs(partes.query)
+        with falso.bloqueo:
+            falso.solicitudes.append(self.path)
+
+        def lista(clave):
+            return [valor for item in consulta.get(clave, []) for valor in item.split(',')]
+
+        coordenadas = list(zip(map(float, lista('latitude')), map(float, lista('longitude'))))
+
+        if partes.path.endswith('/forecast'):
+            horarias = lista('hourly') or ['temperature_2m', 'precipitation']
+            cuerpo = [respuestaPronostico(lat, lng, horarias) for lat, lng in coordenadas]
+            datos = json.dumps(cuerpo if len(cuerpo) > 1 else cuerpo[0]).encode()
+            tipo = 'application/json'
+        else:
+            datos = b''.join(respuestaArchivo(lat, lng, consulta['start_date'][0], consulta['end_date'][0],
+                                              lista('daily'), lista('hourly'), falso.publicado)
+                             for lat, lng in coordenadas)
+            tipo = 'application/octet-stream'
+
+        with falso.bloqueo:
+            falso.bytes_enviados += len(datos)
+
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+class ServidorFalso:
+    """
+    Servidor HTTP local con los endpoints /v1/archive y /v1/forecast de Open-Meteo.
+    """
+
+    def __init__(self, latencia=0.0, puerto=0, publicado=None):
+        self.latencia = latencia
+        self.publicado = publicado  # Último día con datos en el archivo (None: todos)
+        self.solicitudes = []
+        self.bytes_enviados = 0
+        self.bloqueo = threading.Lock()
+
+        manejador = type('Manejador', (_Manejador,), {'servidor_falso': self})
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', puerto), manejador)
+        self.servidor.daemon_threads = True
+
+    @property
+    def url_base(self):
+        return f"http://127.0.0.1:{self.servidor.server_address[1]}"
+
+    @property
+    def url_archivo(self):
+        return f"{self.url_base}/v1/archive"
+
+    @property
+    def url_pronostico(self):
+        return f"{self.url_base}/v1/forecast"
+
+    def iniciar(self):
+        """
+        Atiende solicitudes en un hilo en segundo plano.
+        """
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+        return self
+
+    def detener(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def reiniciarContadores(self):
+        with self.bloqueo:
+            self.solicitudes.clear()
+            self.bytes_enviados = 0
@@ -0,0 +1,241 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa una caché en memoria con vencimiento configurable por
+patrón de URL, desalojo de las entradas menos usadas (LRU) y contadores de
+aciertos y fallos, y un renovador en segundo plano que mantiene vigentes las
+entradas más consultadas.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, Counter
+from datetime import datetime, timedelta
+
+
+def vencimientoPronostico(ahora, minutos=15):
+    """
+    Calcula el vencimiento de un pronóstico: como máximo `minutos` después de
+    obtenerlo, y nunca más allá del comienzo de la próxima hora, que es cuando
+    Open-Meteo publica la siguiente actualización de sus modelos.
+    """
+    momento = datetime.fromtimestamp(ahora)
+    proxima_hora = momento.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    return min(ahora + minutos * 60, proxima_hora.timestamp())
+
+
+class CacheTTL:
+    """
+    Caché segura entre hilos con vencimiento por patrón de clave y desalojo LRU.
+
+    `reglas` es una lista de tuplas (patrón, ttl) que se evalúan en orden; el ttl
+    puede ser None (nunca vence), una cantidad de segundos o una función que
+    recibe el instante actual y devuelve el instante de vencimiento.
+    """
+
+    def __init__(self, reglas, max_entradas=256):
+        self.reglas = [(re.compile(patron), ttl) for patron, ttl in reglas]
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._bloqueo = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def vencimiento(self, clave, ahora):
+        """
+        Devuelve el instante en que vence la clave, o None si no vence nunca.
+        """
+        for patron, ttl in self.reglas:
+            if patron.search(clave):
+                if ttl is None:
+                    return None
+                if callable(ttl):
+                    return ttl(ahora)
+                return ahora + ttl
+
+        # Sin regla que coincida la entrada no se guarda
+        return ahora
+
+    def obtener(self, clave):
+        """
+        Busca una clave vigente. Devuelve una tupla (encontrado, valor).
+        """
+        ahora = time.time()
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                vence, valor = entrada
+                if vence is None or vence > ahora:
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return True, valor
+                del self._entradas[clave]
+
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un valor con el vencimiento que corresponda a su clave.
+        """
+        ahora = time.time()
+        vence = self.vencimiento(clave, ahora)
+        if vence is not None and vence <= ahora:
+            return
+
+        with self._bloqueo:
+            self._entradas[clave] = (vence, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def vigencia(self, clave):
+        """
+        Devuelve los segundos que le quedan a una clave (infinito si no vence y 0 si
+        no está o ya venció), sin contarlo como consulta.
+        """
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+
+        if entrada is None:
+            return 0.0
+
+        vence = entrada[0]
+        return math.inf if vence is None else max(0.0, vence - time.time())
+
+    def limpiar(self):
+        """
+        Elimina todas las entradas y reinicia los contadores.
+        """
+        with self._bloqueo:
+            self._entradas.clear()
+            self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con el tamaño actual y los contadores de la caché.
+        """
+        with self._bloqueo:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+class Renovador:
+    """
+    Hilo en segundo plano que renueva las `cantidad` claves más consultadas de una
+    caché antes de que venzan, para que las próximas consultas sean aciertos.
+
+    Cada visita se registra con los argumentos de `renovar`, la función que vuelve
+    a obtener el valor y guardarlo en la caché. Las visitas se reducen a la mitad
+    en cada ciclo, de modo que cuentan más las recientes.
+    """
+
+    def __init__(self, cache, renovar, cantidad=10, intervalo=60, anticipacion=120):
+        self.cache = cache
+        self.renovar = renovar
+        self.cantidad = cantidad
+        self.intervalo = intervalo
+        self.anticipacion = anticipacion
+        self._visitas = Counter()
+        self._argumentos = {}
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.renovaciones = 0
+        self.errores = 0
+
+    def registrarVisita(self, clave, *argumentos):
+        """
+        Suma una visita a la clave y recuerda cómo renovarla.
+        """
+        with self._bloqueo:
+            self._visitas[clave] += 1
+            self._argumentos[clave] = argumentos
+
+    def masVisitadas(self):
+        """
+        Devuelve las claves más visitadas con sus argumentos de renovación.
+        """
+        with self._bloqueo:
+            return [(clave, self._argumentos[clave]) for clave, _ in self._visitas.most_common(self.cantidad)]
+
+    def ciclo(self):
+        """
+        Renueva las claves más visitadas que vencen dentro de `anticipacion` segundos
+        y reduce a la mitad las visitas. Una clave no se renueva si el valor nuevo no
+        vencería después que el actual (por ejemplo, antes de la próxima actualización
+        del modelo). Devuelve la cantidad de claves renovadas.
+        """
+        renovadas = errores = 0
+        for clave, argumentos in self.masVisitadas():
+            vigencia = self.cache.vigencia(clave)
+            if vigencia > self.anticipacion:
+                continue
+
+            ahora = time.time()
+            vence = self.cache.vencimiento(clave, ahora)
+            if vence is not None and vence <= ahora + vigencia:
+                continue
+
+            try:
+                self.renovar(*argumentos)
+                renovadas += 1
+            except Exception:
+                errores += 1  # Se reintenta en el próximo ciclo
+
+        with self._bloqueo:
+            self._visitas = Counter({clave: visitas / 2 for clave, visitas in self._visitas.items()
+                                     if visitas >= 1})
+            self._argumentos = {clave: self._argumentos[clave] for clave in self._visitas}
+            self.renovaciones += renovadas
+            self.errores += errores
+
+        return renovadas
+
+    def iniciar(self):
+        """
+        Inicia el hilo del renovador si todavía no está corriendo.
+        """
+        with self._bloqueo:
+            if self._hilo is not None and self._hilo.is_alive():
+                return self
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ejecutar, name="renovador", daemon=True)
+            self._hilo.start()
+
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            self.ciclo()
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con las claves seguidas y los contadores del renovador.
+        """
+        with self._bloqueo:
+            return {
+                "seguidas": len(self._visitas),
+                "renovaciones": self.renovaciones,
+                "errores": self.errores,
+                "activo": self._hilo is not None and self._hilo.is_alive(),
+            }
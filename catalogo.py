@@ -0,0 +1,80 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa el catálogo de variables de Open-Meteo que usa la
+aplicación: nombre, frecuencia (diaria u horaria), unidad, agregación con la que
+se resume en períodos más largos, tipo de dato y descripción. A partir del
+catálogo se definen las variables por defecto de cada descarga y el esquema de
+tipos de los archivos de historial.
+"""
+
+from collections import namedtuple
+
+Variable = namedtuple('Variable', ['nombre', 'frecuencia', 'unidad', 'agregacion', 'tipo', 'descripcion'])
+
+# Catálogo de variables, en el orden en que se descargan y exportan
+CATALOGO = {variable.nombre: variable for variable in [
+    # Variables diarias
+    Variable('temperature_2m_max', 'diaria', '°C', 'max', 'float32', 'Temperatura máxima a 2 m'),
+    Variable('temperature_2m_min', 'diaria', '°C', 'min', 'float32', 'Temperatura mínima a 2 m'),
+    Variable('temperature_2m_mean', 'diaria', '°C', 'mean', 'float32', 'Temperatura media a 2 m'),
+    Variable('daylight_duration', 'diaria', 's', 'mean', 'float32', 'Duración de la luz del día'),
+    Variable('sunshine_duration', 'diaria', 's', 'mean', 'float32', 'Duración del sol directo'),
+    Variable('precipitation_sum', 'diaria', 'mm', 'sum', 'float32', 'Precipitación total'),
+    Variable('rain_sum', 'diaria', 'mm', 'sum', 'float32', 'Lluvia total'),
+    Variable('wind_speed_10m_max', 'diaria', 'km/h', 'max', 'float32', 'Velocidad máxima del viento a 10 m'),
+    Variable('shortwave_radiation_sum', 'diaria', 'MJ/m²', 'sum', 'float32', 'Radiación solar de onda corta total'),
+
+    # Variables horarias
+    Variable('temperature_2m', 'horaria', '°C', 'mean', 'float32', 'Temperatura a 2 m'),
+    Variable('precipitation', 'horaria', 'mm', 'sum', 'float32', 'Precipitación'),
+    Variable('wind_speed_10m', 'horaria', 'km/h', 'mean', 'float32', 'Velocidad del viento a 10 m'),
+    Variable('wind_direction_10m', 'horaria', '°', 'mean', 'float32', 'Dirección del viento a 10 m'),
+    Variable('shortwave_radiation', 'horaria', 'W/m²', 'mean', 'float32', 'Radiación solar de onda corta'),
+]}
+
+
+def variablesDe(frecuencia):
+    """
+    Devuelve los nombres de las variables de una frecuencia ('diaria' u 'horaria').
+    """
+    return [nombre for nombre, variable in CATALOGO.items() if variable.frecuencia == frecuencia]
+
+
+def validarVariables(nombres, frecuencia=None):
+    """
+    Verifica que las variables existan en el catálogo (y sean de la frecuencia
+    indicada) y devuelve la lista sin repetidos, conservando el orden.
+    """
+    nombres = list(dict.fromkeys([nombres] if isinstance(nombres, str) else nombres))
+
+    desconocidas = [n for n in nombres if n not in CATALOGO
+                    or (frecuencia and CATALOGO[n].frecuencia != frecuencia)]
+    if desconocidas:
+        raise ValueError(f"Variables desconocidas{f' ({frecuencia})' if frecuencia else ''}: "
+                         f"{', '.join(desconocidas)}")
+
+    return nombres
+
+
+def esquema(nombres=None):
+    """
+    Devuelve el diccionario {variable: tipo} para leer archivos con las variables indicadas
+    (por defecto todas las diarias).
+    """
+    nombres = variablesDe('diaria') if nombres is None else nombres
+
+    return {nombre: CATALOGO[nombre].tipo for nombre in nombres if nombre in CATALOGO}
+
+
+def variablesConUnidad(unidad, nombres=None):
+    """
+    Devuelve las variables del catálogo (o de la lista indicada) expresadas en una unidad.
+    """
+    nombres = CATALOGO if nombres is None else nombres
+
+    return [nombre for nombre in nombres if nombre in CATALOGO and CATALOGO[nombre].unidad == unidad]
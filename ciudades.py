@@ -0,0 +1,146 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa un índice de ciudades: búsqueda directa de ciudades y
+coordenadas por país, y un árbol KD sobre las coordenadas para encontrar la
+ciudad más cercana a un punto o las ciudades dentro de un radio.
+"""
+
+import os
+import pickle
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Radio medio de la Tierra en kilómetros
+RADIO_TIERRA_KM = 6371.0088
+
+
+def aCartesianas(lat, lng):
+    """
+    Convierte coordenadas geográficas en grados a puntos sobre la esfera unitaria.
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lng = np.radians(np.asarray(lng, dtype=np.float64))
+
+    return np.column_stack((np.cos(lat) * np.cos(lng),
+                            np.cos(lat) * np.sin(lng),
+                            np.sin(lat)))
+
+
+def cuerdaAKm(cuerda):
+    """
+    Convierte la distancia en línea recta sobre la esfera unitaria en kilómetros de arco.
+    """
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.clip(np.asarray(cuerda) / 2, 0, 1))
+
+
+def kmACuerda(km):
+    """
+    Convierte kilómetros de arco en distancia en línea recta sobre la esfera unitaria.
+    """
+    return 2 * np.sin(np.asarray(km) / (2 * RADIO_TIERRA_KM))
+
+
+class IndiceCiudades:
+    """
+    Índice de ciudades construido una sola vez a partir del dataset de SimpleMaps.
+    """
+
+    def __init__(self, data):
+        # Se conserva la primera aparición de cada ciudad dentro de su país,
+        # igual que la selección por máscara que reemplaza
+        data = data.drop_duplicates(subset=['country', 'city_ascii'], keep='first')
+
+        self.paises = data['country'].unique().tolist()
+        self.nombres = data['city_ascii'].to_numpy()
+        self.paises_ciudad = data['country'].to_numpy()
+        self.lat = data['lat'].to_numpy(dtype=np.float64)
+        self.lng = data['lng'].to_numpy(dtype=np.float64)
+
+        # Diccionarios para las búsquedas directas por país y ciudad
+        self.ciudades = {pais: grupo.tolist()
+                         for pais, grupo in data.groupby('country', sort=False, observed=True)['city_ascii']}
+        self.posiciones = {clave: i for i, clave in
+                           enumerate(zip(self.paises_ciudad, self.nombres))}
+
+        # Árbol KD sobre la esfera unitaria para consultas espaciales
+        self.arbol = cKDTree(aCartesianas(self.lat, self.lng))
+
+    def ciudadesDe(self, pais):
+        """
+        Devuelve la lista ordenada de ciudades de un país.
+        """
+        return self.ciudades.get(pais, [])
+
+    def coordenadas(self, pais, ciudad):
+        """
+        Devuelve la tupla (lat, lng) de una ciudad.
+        """
+        i = self.posiciones[(pais, ciudad)]
+
+        return float(self.lat[i]), float(self.lng[i])
+
+    def _resultado(self, i, km):
+        return {
+            "city_ascii": self.nombres[i],
+            "country": self.paises_ciudad[i],
+            "lat": float(self.lat[i]),
+            "lng": float(self.lng[i]),
+            "distancia_km": float(km),
+        }
+
+    def ciudadMasCercana(self, lat, lng, k=1):
+        """
+        Devuelve las `k` ciudades más cercanas a un punto, ordenadas por distancia.
+        """
+        cuerdas, indices = self.arbol.query(aCartesianas(lat, lng)[0], k=k)
+
+        return [self._resultado(i, km)
+                for i, km in zip(np.atleast_1d(indices), cuerdaAKm(np.atleast_1d(cuerdas)))]
+
+    def ciudadesEnRadio(self, lat, lng, radio_km):
+        """
+        Devuelve las ciudades a menos de `radio_km` kilómetros de un punto,
+        ordenadas por distancia.
+        """
+        punto = aCartesianas(lat, lng)[0]
+        indices = np.asarray(self.arbol.query_ball_point(punto, kmACuerda(radio_km)), dtype=np.int64)
+        if len(indices) == 0:
+            return []
+
+        cuerdas = np.linalg.norm(self.arbol.data[indices] - punto, axis=1)
+        orden = np.argsort(cuerdas)
+
+        return [self._resultado(indices[i], km)
+                for i, km in zip(orden, cuerdaAKm(cuerdas[orden]))]
+
+
+def cargarIndice(ruta_csv, cargar_datos, fuentes=()):
+    """
+    Devuelve el índice de ciudades guardado junto al CSV, o lo reconstruye con
+    `cargar_datos()` y lo guarda si no existe o si el CSV (u otro archivo de
+    `fuentes`, como su versión compilada) es más reciente. Los archivos que no
+    existen no se comparan, de modo que alcanza con tener uno solo.
+    """
+    ruta_indice = os.path.splitext(ruta_csv)[0] + '.indice.pkl'
+    modificaciones = [os.path.getmtime(ruta) for ruta in (ruta_csv, *fuentes) if os.path.exists(ruta)]
+
+    if os.path.exists(ruta_indice) and os.path.getmtime(ruta_indice) >= max(modificaciones, default=0):
+        try:
+            with open(ruta_indice, 'rb') as archivo:
+                return pickle.load(archivo)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass  # Índice dañado o de otra versión: se reconstruye
+
+    indice = IndiceCiudades(cargar_datos())
+
+    temporal = f"{ruta_indice}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as archivo:
+        pickle.dump(indice, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta_indice)
+
+    return indice
@@ -0,0 +1,207 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa la climatología por día del año (media y desvío en una
+ventana móvil circular de días) calculada a partir del historial almacenado de
+cada ubicación, y la detección de anomalías del pronóstico mediante puntajes z.
+Las climatologías se guardan junto al historial de la ubicación y solo se
+recalculan cuando sus series cambian, de modo que evaluar muchas ciudades sea
+una lectura y no un recálculo de todo el historial.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import almacen
+import diario
+
+# Variables con climatología y ventana móvil por defecto (días, centrada)
+VARIABLES_CLIMATOLOGIA = ['temperature_2m_max', 'temperature_2m_min',
+                          'temperature_2m_mean', 'precipitation_sum']
+VENTANA_DIAS = 15
+DIAS_ANIO = 365
+
+# Mínimo de valores en la ventana para que la climatología de un día sea válida
+MIN_CANTIDAD = 30
+
+# Puntaje z a partir del cual un valor se considera anómalo
+UMBRAL_Z = 2.0
+
+# Resumen diario del pronóstico horario y variable climatológica con la que se compara
+COMPARACIONES_PRONOSTICO = {
+    'Máxima °C': ('Temperatura °C', 'max', 'temperature_2m_max'),
+    'Mínima °C': ('Temperatura °C', 'min', 'temperature_2m_min'),
+}
+
+
+def diaClimatologico(fechas):
+    """
+    Devuelve el día del año de cada fecha en un calendario de 365 días (0 a 364):
+    el 29 de febrero se cuenta como 28 de febrero y en los años bisiestos los días
+    posteriores se corren uno para coincidir con los demás años.
+    """
+    fechas = pd.DatetimeIndex(np.asarray(fechas, dtype='datetime64[ns]'))
+    dia = fechas.dayofyear.to_numpy() - 1
+    corrido = fechas.is_leap_year & (dia >= 59)
+
+    return dia - corrido.astype(np.int64)
+
+
+def _sumaCircular(valores, ventana):
+    """
+    Suma de cada día con sus vecinos en una ventana centrada, dando la vuelta al año.
+    """
+    mitad = ventana // 2
+    extendido = np.concatenate((valores[-mitad:], valores, valores[:mitad])) if mitad else valores
+    acumulado = np.concatenate(([0.0], np.cumsum(extendido)))
+
+    return acumulado[ventana:] - acumulado[:-ventana]
+
+
+def calcularClimatologia(fechas, valores, ventana=VENTANA_DIAS):
+    """
+    Calcula la media, el desvío y la cantidad de valores de cada día del año sobre
+    una ventana móvil circular. Devuelve tres arrays de 365 elementos; los días con
+    menos de MIN_CANTIDAD valores quedan nulos.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = ~np.isnan(valores)
+    dias = diaClimatologico(fechas)[validos]
+    valores = valores[validos]
+
+    # Sumas por día del año y luego por ventana
+    cantidad = _sumaCircular(np.bincount(dias, minlength=DIAS_ANIO).astype(np.float64), ventana)
+    suma = _sumaCircular(np.bincount(dias, weights=valores, minlength=DIAS_ANIO), ventana)
+    suma_cuadrados = _sumaCircular(np.bincount(dias, weights=valores ** 2, minlength=DIAS_ANIO), ventana)
+
+    suficientes = cantidad >= max(MIN_CANTIDAD, 2)
+    n = np.where(suficientes, cantidad, np.nan)
+    media = suma / n
+    varianza = np.maximum(suma_cuadrados - suma * media, 0) / (n - 1)
+
+    return media, np.sqrt(varianza), cantidad.astype(np.int64)
+
+
+def rutaClimatologia(lat, lng, ventana=VENTANA_DIAS):
+    """
+    Devuelve la ruta del archivo Parquet con la climatología de una ubicación.
+    """
+    return os.path.join(almacen.DIR_HISTORIAL, almacen.claveUbicacion(lat, lng),
+                        f"climatologia_{ventana}.parquet")
+
+
+def construirClimatologia(lat, lng, variables=VARIABLES_CLIMATOLOGIA, ventana=VENTANA_DIAS):
+    """
+    Calcula la climatología de una ubicación a partir de sus series almacenadas y la
+    guarda. Devuelve un DataFrame indexado por día del año (1 a 365) con las columnas
+    <variable>_media, <variable>_desvio y <variable>_cantidad.
+    """
+    with almacen.bloqueoUbicacion(lat, lng):
+        series = {variable: almacen.leerSerie(lat, lng, variable) for variable in variables}
+
+    clima = pd.DataFrame(index=pd.RangeIndex(1, DIAS_ANIO + 1, name='dia'))
+    for variable, serie in series.items():
+        media, desvio, cantidad = calcularClimatologia(serie['date'], serie[variable], ventana)
+        clima[f"{variable}_media"] = media.astype(np.float32)
+        clima[f"{variable}_desvio"] = desvio.astype(np.float32)
+        clima[f"{variable}_cantidad"] = cantidad.astype(np.int32)
+
+    ruta = rutaClimatologia(lat, lng, ventana)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    clima.to_parquet(temporal)
+    os.replace(temporal, ruta)
+
+    return clima
+
+
+def obtenerClimatologia(lat, lng, variables=VARIABLES_CLIMATOLOGIA, ventana=VENTANA_DIAS):
+    """
+    Devuelve la climatología guardada de una ubicación, recalculándola solo si alguna
+    de sus series es más reciente. Devuelve None si no hay historial almacenado.
+    """
+    rutas_series = [almacen.rutaSerie(lat, lng, variable) for variable in variables]
+    fechas_series = [os.path.getmtime(r) for r in rutas_series if os.path.exists(r)]
+    if not fechas_series:
+        return None
+
+    ruta = rutaClimatologia(lat, lng, ventana)
+    if os.path.exists(ruta) and os.path.getmtime(ruta) >= max(fechas_series):
+        try:
+            clima = pd.read_parquet(ruta)
+            if all(f"{variable}_media" in clima for variable in variables):
+                return clima
+        except (OSError, ValueError):
+            pass  # Archivo dañado: se recalcula
+
+    return construirClimatologia(lat, lng, variables, ventana)
+
+
+def puntajesZ(fechas, valores, climatologia, variable):
+    """
+    Calcula el puntaje z de cada valor respecto de la climatología de su día del año.
+    """
+    dia = diaClimatologico(fechas)
+    media = climatologia[f"{variable}_media"].to_numpy(dtype=np.float64)[dia]
+    desvio = climatologia[f"{variable}_desvio"].to_numpy(dtype=np.float64)[dia]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.asarray(valores, dtype=np.float64) - media) / desvio
+
+
+def _matrizClimatologia(climatologias, ubicaciones, columna):
+    """
+    Apila una columna de las climatologías en una matriz (ubicación, día del año).
+    """
+    if not ubicaciones:
+        return np.full((1, DIAS_ANIO), np.nan)
+
+    return np.stack([climatologias[u][columna].to_numpy(dtype=np.float64) for u in ubicaciones])
+
+
+def anomaliasPronostico(pronostico, climatologias, umbral=UMBRAL_Z):
+    """
+    Resume por día un pronóstico horario y compara las temperaturas máxima y mínima
+    con la climatología. Para una sola ubicación `climatologias` es un DataFrame; si
+    el pronóstico tiene columna 'ubicacion' es un diccionario {ubicación: climatología}
+    y todas las ubicaciones se evalúan juntas. Agrega el puntaje z de cada variable
+    comparada (z_<variable>) y la columna 'anomalo' cuando alguno alcanza el umbral.
+    """
+    varias = 'ubicacion' in pronostico
+    agregaciones = {salida: (columna, operacion)
+                    for salida, (columna, operacion, _) in COMPARACIONES_PRONOSTICO.items()}
+    resultado = diario.resumirPorDia(pronostico, agregaciones, claves=['ubicacion'] if varias else ())
+
+    # Matriz (ubicación, día del año) por variable para indexar todas las filas a la vez
+    if varias:
+        ubicaciones = list(climatologias)
+        fila = resultado['ubicacion'].map({u: i for i, u in enumerate(ubicaciones)})
+        con_clima = fila.notna().to_numpy()
+        fila = fila.fillna(0).to_numpy(dtype=np.int64)
+    else:
+        ubicaciones = [None]
+        climatologias = {None: climatologias}
+        con_clima = np.ones(len(resultado), dtype=bool)
+        fila = np.zeros(len(resultado), dtype=np.int64)
+
+    dia = diaClimatologico(resultado['Fecha'])
+    anomalo = np.zeros(len(resultado), dtype=bool)
+
+    for salida, (_, _, variable) in COMPARACIONES_PRONOSTICO.items():
+        medias = _matrizClimatologia(climatologias, ubicaciones, f"{variable}_media")
+        desvios = _matrizClimatologia(climatologias, ubicaciones, f"{variable}_desvio")
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (resultado[salida].to_numpy() - medias[fila, dia]) / desvios[fila, dia]
+        z[~con_clima] = np.nan
+
+        resultado[f"z_{variable}"] = z
+        anomalo |= np.abs(z) >= umbral
+
+    resultado['anomalo'] = anomalo
+
+    return resultado
@@ -0,0 +1,126 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa el resumen diario de series horarias: todas las
+agregaciones de cada día se calculan en una sola pasada con NumPy (reduceat
+sobre los límites de cada día ya ordenados), para cualquier variable y con
+agregaciones propias como horas sobre un umbral o horas con precipitación.
+Opcionalmente agrupa también por ubicación para procesar muchas ciudades juntas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def horasSobre(umbral):
+    """
+    Agregación que cuenta las horas del día con valores mayores al umbral.
+    """
+    def condicion(valores):
+        return valores > umbral
+
+    condicion.__name__ = f"horasSobre({umbral})"
+
+    return condicion
+
+
+def horasConPrecipitacion(minimo=0.1):
+    """
+    Agregación que cuenta las horas del día con al menos `minimo` mm de precipitación.
+    """
+    def condicion(valores):
+        return valores >= minimo
+
+    condicion.__name__ = f"horasConPrecipitacion({minimo})"
+
+    return condicion
+
+
+def _reducir(valores, inicios, operacion):
+    """
+    Aplica una operación a cada tramo [inicios[i], inicios[i + 1]) de los valores.
+    Los nulos se ignoran; un día sin datos da nulo en mínimo, máximo y media.
+    """
+    nulos = np.isnan(valores)
+    cantidades = np.add.reduceat(~nulos, inicios)
+
+    if operacion == 'count':
+        return cantidades
+    if operacion == 'min':
+        resultado = np.fmin.reduceat(valores, inicios)
+    elif operacion == 'max':
+        resultado = np.fmax.reduceat(valores, inicios)
+    elif operacion in ('sum', 'mean'):
+        sumas = np.add.reduceat(np.where(nulos, 0.0, valores), inicios)
+        if operacion == 'sum':
+            return sumas
+        resultado = sumas / np.maximum(cantidades, 1)
+    elif callable(operacion):
+        # Agregación propia: se suma por día lo que devuelve para cada hora
+        aportes = np.asarray(operacion(valores), dtype=np.float64)
+        return np.add.reduceat(np.where(nulos, 0.0, aportes), inicios)
+    else:
+        raise ValueError(f"Agregación desconocida: {operacion}")
+
+    return np.where(cantidades > 0, resultado, np.nan)
+
+
+def resumirPorDia(df, agregaciones, columna_fecha='Fecha', claves=()):
+    """
+    Resume una serie horaria por día en una sola pasada.
+
+    `agregaciones` indica, para cada columna de salida, la tupla (columna, operación),
+    donde la operación es 'min', 'max', 'sum', 'mean', 'count' o una función que
+    recibe los valores horarios y devuelve lo que aporta cada hora al total del día
+    (por ejemplo horasSobre(30)). `claves` son columnas adicionales de agrupación,
+    como la ubicación. El DataFrame recibido no se modifica.
+    """
+    fechas = df[columna_fecha]
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas)
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_localize(None)  # Se agrupa por el día en hora local
+    dias = fechas.to_numpy().astype('datetime64[D]')
+    claves = list(claves)
+
+    # Clave entera única por grupo (claves, día); las claves se numeran en el
+    # orden de su primera aparición
+    grupo = np.zeros(len(dias), dtype=np.int64)
+    for columna in claves:
+        codigo = pd.factorize(df[columna])[0]
+        grupo = grupo * (codigo.max(initial=0) + 1) + codigo
+    if len(dias):
+        numero_dia = (dias - dias.min()).astype(np.int64)
+        grupo = grupo * (numero_dia.max() + 1) + numero_dia
+
+    # Solo se reordena si los datos no vienen ya ordenados por claves y fecha
+    paso = np.diff(grupo)
+    if (paso < 0).any():
+        orden = np.argsort(grupo, kind='stable')
+        dias, grupo = dias[orden], grupo[orden]
+        paso = np.diff(grupo)
+    else:
+        orden = slice(None)
+
+    # Cada grupo queda en un tramo contiguo que empieza donde cambia la clave
+    inicios = np.flatnonzero(np.r_[True, paso != 0]) if len(dias) else np.empty(0, dtype=np.int64)
+
+    resultado = {c: df[c].to_numpy()[orden][inicios] for c in claves}
+    resultado[columna_fecha] = dias[inicios].astype('datetime64[ns]')
+
+    if len(inicios) == 0:
+        for salida in agregaciones:
+            resultado[salida] = np.empty(0, dtype=np.float64)
+        return pd.DataFrame(resultado)
+
+    columnas = {}
+    for salida, (columna, operacion) in agregaciones.items():
+        if columna not in columnas:
+            columnas[columna] = df[columna].to_numpy(dtype=np.float64)[orden]
+        resultado[salida] = _reducir(columnas[columna], inicios, operacion)
+
+    return pd.DataFrame(resultado)
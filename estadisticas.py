@@ -0,0 +1,292 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa estadísticas en streaming para historiales que no entran
+en memoria: acumuladores combinables de cantidad, mínimo, máximo, media y
+varianza (Welford / Chan) y cuantiles aproximados mediante un t-digest. Los
+datos se consumen por bloques (CSV por partes o generadores de DataFrames) y
+los resultados de distintos archivos o ciudades se pueden combinar.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+# Cuantiles informados por defecto
+CUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class Acumulador:
+    """
+    Cantidad, mínimo, máximo, media y suma de cuadrados de las desviaciones (M2)
+    de una variable, actualizables por bloques y combinables entre sí.
+    """
+
+    def __init__(self):
+        self.cantidad = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def actualizar(self, valores):
+        """
+        Incorpora un bloque de valores; los nulos se ignoran.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        # Estadísticos del bloque y combinación con lo acumulado
+        bloque = Acumulador()
+        bloque.cantidad = len(valores)
+        bloque.minimo = valores.min()
+        bloque.maximo = valores.max()
+        bloque.media = valores.mean()
+        bloque.m2 = np.square(valores - bloque.media).sum()
+
+        return self._incorporar(bloque)
+
+    def _incorporar(self, otro):
+        """
+        Combina otro acumulador en este con la fórmula de Chan para la varianza.
+        """
+        if otro.cantidad == 0:
+            return self
+
+        total = self.cantidad + otro.cantidad
+        delta = otro.media - self.media
+
+        self.media += delta * otro.cantidad / total
+        self.m2 += otro.m2 + delta ** 2 * self.cantidad * otro.cantidad / total
+        self.cantidad = total
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+
+        return self
+
+    def combinar(self, otro):
+        """
+        Devuelve un nuevo acumulador con los datos de ambos.
+        """
+        resultado = Acumulador()._incorporar(self)
+
+        return resultado._incorporar(otro)
+
+    @property
+    def varianza(self):
+        """
+        Varianza muestral (n - 1).
+        """
+        return self.m2 / (self.cantidad - 1) if self.cantidad > 1 else np.nan
+
+    @property
+    def desvio(self):
+        return np.sqrt(self.varianza)
+
+
+class TDigest:
+    """
+    Resumen compacto de una distribución para estimar cuantiles. Los valores se
+    agrupan en centroides (media, peso) que son más finos en los extremos de la
+    distribución, donde los cuantiles requieren mayor precisión.
+    """
+
+    def __init__(self, compresion=100, tamano_buffer=5000):
+        self.compresion = compresion
+        self.tamano_buffer = tamano_buffer
+        self.medias = np.empty(0)
+        self.pesos = np.empty(0)
+        self._buffer = []
+        self._en_buffer = 0
+
+    def actualizar(self, valores):
+        """
+        Incorpora un bloque de valores; los nulos se ignoran.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            self._buffer.append(valores)
+            self._en_buffer += len(valores)
+            if self._en_buffer >= self.tamano_buffer:
+                self._comprimir()
+
+        return self
+
+    def _limiteCuantil(self, q):
+        """
+        Cuantil máximo que puede abarcar un centroide que empieza en q, según la
+        función de escala k(q) = δ / 2π · asin(2q - 1).
+        """
+        k = self.compresion / (2 * np.pi) * np.arcsin(2 * q - 1) + 1
+        k = min(k, self.compresion / 4)
+
+        return (np.sin(2 * np.pi * k / self.compresion) + 1) / 2
+
+    def _comprimir(self):
+        """
+        Une el buffer con los centroides y fusiona los vecinos que entran en el límite.
+        """
+        if self._buffer:
+            medias = np.concatenate([self.medias, *self._buffer])
+            pesos = np.concatenate([self.pesos, np.ones(self._en_buffer)])
+            self._buffer, self._en_buffer = [], 0
+        else:
+            medias, pesos = self.medias, self.pesos
+
+        if len(medias) == 0:
+            return
+
+        orden = np.argsort(medias, kind='stable')
+        medias, pesos = medias[orden], pesos[orden]
+        total = pesos.sum()
+
+        nuevas_medias, nuevos_pesos = [], []
+        media_actual, peso_actual = medias[0], pesos[0]
+        acumulado = 0.0
+        limite = self._limiteCuantil(0.0)
+
+        for media, peso in zip(medias[1:], pesos[1:]):
+            if (acumulado + peso_actual + peso) / total <= limite:
+                # Fusión ponderada en el centroide actual
+                peso_actual += peso
+                media_actual += (media - media_actual) * peso / peso_actual
+            else:
+                nuevas_medias.append(media_actual)
+                nuevos_pesos.append(peso_actual)
+                acumulado += peso_actual
+                limite = self._limiteCuantil(acumulado / total)
+                media_actual, peso_actual = media, peso
+
+        nuevas_medias.append(media_actual)
+        nuevos_pesos.append(peso_actual)
+        self.medias = np.array(nuevas_medias)
+        self.pesos = np.array(nuevos_pesos)
+
+    def combinar(self, otro):
+        """
+        Devuelve un nuevo t-digest con los datos de ambos.
+        """
+        self._comprimir()
+        otro._comprimir()
+
+        resultado = TDigest(self.compresion, self.tamano_buffer)
+        resultado.medias = np.concatenate([self.medias, otro.medias])
+        resultado.pesos = np.concatenate([self.pesos, otro.pesos])
+        resultado._comprimir()
+
+        return resultado
+
+    def cuantil(self, q, minimo=None, maximo=None):
+        """
+        Estima uno o varios cuantiles interpolando entre los centros de los centroides.
+        Si se indican mínimo y máximo exactos se usan como extremos de la interpolación.
+        """
+        self._comprimir()
+        if len(self.medias) == 0:
+            return np.full(np.shape(q), np.nan)
+
+        total = self.pesos.sum()
+        centros = (np.cumsum(self.pesos) - self.pesos / 2) / total
+        medias = self.medias
+
+        if minimo is not None and maximo is not None:
+            centros = np.concatenate(([0.0], centros, [1.0]))
+            medias = np.concatenate(([minimo], medias, [maximo]))
+
+        return np.interp(q, centros, medias)
+
+
+class ResumenEstadistico:
+    """
+    Acumuladores y t-digest por variable, alimentados con bloques de DataFrames.
+    """
+
+    def __init__(self, columnas=None, compresion=100):
+        self.columnas = list(columnas) if columnas is not None else None
+        self.compresion = compresion
+        self.acumuladores = {}
+        self.digests = {}
+
+    def actualizar(self, df):
+        """
+        Incorpora un bloque; si no se indicaron columnas se usan las numéricas del primer bloque.
+        """
+        if self.columnas is None:
+            self.columnas = df.select_dtypes('number').columns.tolist()
+
+        for columna in self.columnas:
+            if columna not in df:
+                continue
+            valores = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float64)
+            self.acumuladores.setdefault(columna, Acumulador()).actualizar(valores)
+            self.digests.setdefault(columna, TDigest(self.compresion)).actualizar(valores)
+
+        return self
+
+    def combinar(self, otro):
+        """
+        Devuelve un nuevo resumen con los datos de ambos (por ejemplo, de dos ciudades).
+        """
+        resultado = ResumenEstadistico(compresion=self.compresion)
+        columnas = list(dict.fromkeys([*(self.columnas or []), *(otro.columnas or [])]))
+        resultado.columnas = columnas
+
+        for columna in columnas:
+            partes = [r for r in (self, otro) if columna in r.acumuladores]
+            acumulador, digest = Acumulador(), TDigest(self.compresion)
+            for parte in partes:
+                acumulador = acumulador.combinar(parte.acumuladores[columna])
+                digest = digest.combinar(parte.digests[columna])
+            resultado.acumuladores[columna] = acumulador
+            resultado.digests[columna] = digest
+
+        return resultado
+
+    def resultado(self, cuantiles=CUANTILES):
+        """
+        Devuelve un DataFrame con una fila por variable y los estadísticos numéricos.
+        """
+        filas = {}
+        for columna in self.columnas or []:
+            if columna not in self.acumuladores:
+                continue
+            acumulador = self.acumuladores[columna]
+            fila = {
+                'cantidad': acumulador.cantidad,
+                'minimo': acumulador.minimo if acumulador.cantidad else np.nan,
+                'maximo': acumulador.maximo if acumulador.cantidad else np.nan,
+                'media': acumulador.media if acumulador.cantidad else np.nan,
+                'varianza': acumulador.varianza,
+                'desvio': acumulador.desvio,
+            }
+            valores = self.digests[columna].cuantil(np.asarray(cuantiles), acumulador.minimo,
+                                                    acumulador.maximo)
+            for q, valor in zip(cuantiles, np.atleast_1d(valores)):
+                fila[f"p{round(q * 100):02d}"] = valor
+            filas[columna] = fila
+
+        return pd.DataFrame.from_dict(filas, orient='index')
+
+
+def estadisticasEnStreaming(fuente, columnas=None, tamano_bloque=100_000):
+    """
+    Calcula el resumen estadístico de una fuente sin cargarla completa en memoria.
+    La fuente puede ser la ruta de un CSV (leído por partes) o un iterable de
+    DataFrames, como el generador de historial horario de la API.
+    """
+    if isinstance(fuente, (str, os.PathLike)):
+        fuente = pd.read_csv(fuente, chunksize=tamano_bloque,
+                             usecols=lambda c: columnas is None or c in columnas)
+
+    resumen = ResumenEstadistico(columnas)
+    for bloque in fuente:
+        resumen.actualizar(bloque)
+
+    return resumen
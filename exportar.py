@@ -0,0 +1,151 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa la exportación masiva del historial climático desde la
+línea de comandos, sin pasar por la interfaz de Streamlit. Descarga varias
+ciudades en paralelo, respetando el límite de solicitudes a Open-Meteo que
+comparten todos los procesos (ver programador.py), reintenta los fallos y
+permite reanudar una exportación interrumpida.
+
+Ejemplos:
+    python exportar.py --pais Argentina --desde 2020-01-01 --hasta 2024-12-31
+    python exportar.py --ciudad "Argentina:Cordoba" --ciudad "Chile:Santiago" --formato parquet
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import catalogo
+import ciudades
+import programador
+import utils as util
+
+
+def rutaSalida(salida, pais, ciudad, desde, hasta, formato):
+    """
+    Devuelve la ruta particionada por país y ciudad del archivo de una exportación.
+    """
+    return os.path.join(salida, f"country={pais}", f"city={ciudad}", f"{desde}_{hasta}.{formato}")
+
+
+def exportarCiudad(pais, ciudad, lat, lng, desde, hasta, salida, formato, reintentos, variables=None):
+    """
+    Descarga y guarda el historial de una ciudad, reintentando con espera
+    exponencial. Devuelve la ruta escrita, o la existente si ya estaba exportada.
+    Sin `hasta` se exporta hasta el último día ya publicado por el archivo; un
+    archivo que llega a los días recientes se vuelve a exportar, porque pudo
+    quedar con días sin publicar.
+    """
+    import api  # Se importa en el proceso trabajador, que crea su propia sesión
+
+    hasta = hasta or api.ultimoDiaArchivado().isoformat()
+    ruta = rutaSalida(salida, pais, ciudad, desde, hasta, formato)
+    if os.path.exists(ruta) and not api.archivoReciente(hasta):
+        return ruta
+
+    for intento in range(reintentos + 1):
+        try:
+            # Carril masivo: las solicitudes de la interfaz se atienden primero
+            with api.programador_api.prioridad(programador.MASIVA):
+                df = api.obtenerTemperaturaHistorica(lat, lng, desde, hasta,
+                                                     variables or api.VARIABLES_DIARIAS)
+            break
+        except Exception:
+            if intento == reintentos:
+                raise
+            time.sleep(2 ** intento)
+
+    # Escritura atómica: un archivo parcial nunca queda con el nombre final
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    if formato == "parquet":
+        df.to_parquet(temporal, index=False)
+    else:
+        df.to_csv(temporal, index=False, date_format=util.FORMATO_FECHA)
+    os.replace(temporal, ruta)
+
+    return ruta
+
+
+def seleccionarCiudades(indice, pais=None, lista=()):
+    """
+    Devuelve las tuplas (país, ciudad, lat, lng) a exportar: todas las de un país
+    y/o las indicadas como "País:Ciudad".
+    """
+    seleccion = []
+    if pais:
+        if pais not in indice.ciudades:
+            raise SystemExit(f"País desconocido: {pais}")
+        seleccion += [(pais, ciudad) for ciudad in indice.ciudadesDe(pais)]
+
+    for item in lista:
+        nombre_pais, _, ciudad = item.partition(":")
+        if (nombre_pais, ciudad) not in indice.posiciones:
+            raise SystemExit(f"Ciudad desconocida: {item}")
+        seleccion.append((nombre_pais, ciudad))
+
+    return [(p, c, *indice.coordenadas(p, c)) for p, c in dict.fromkeys(seleccion)]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Exportación masiva del historial climático.")
+    parser.add_argument("--pais", help="Exporta todas las ciudades del país indicado")
+    parser.add_argument("--ciudad", action="append", default=[],
+                        help='Ciudad a exportar con el formato "País:Ciudad" (se puede repetir)')
+    parser.add_argument("--desde", default="2020-01-01", help="Fecha inicial (AAAA-MM-DD)")
+    parser.add_argument("--hasta", help="Fecha final (AAAA-MM-DD); por defecto, el último día ya "
+                                        "publicado por el archivo de Open-Meteo")
+    parser.add_argument("--salida", default="exportacion", help="Directorio de salida")
+    parser.add_argument("--formato", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--procesos", type=int, default=4, help="Cantidad de procesos trabajadores")
+    parser.add_argument("--reintentos", type=int, default=3)
+    parser.add_argument("--variables", type=lambda texto: texto.split(","),
+                        help="Variables diarias separadas por comas (por defecto todas las del catálogo)")
+    args = parser.parse_args(argumentos)
+
+    if not args.pais and not args.ciudad:
+        parser.error("Indique --pais o al menos una --ciudad")
+
+    if args.variables:
+        try:
+            catalogo.validarVariables(args.variables, "diaria")
+        except ValueError as error:
+            parser.error(str(error))
+
+    indice = ciudades.cargarIndice(util.FILE_PAISES, util.obtenerPaises, fuentes=[util.FILE_PAISES_BINARIO])
+    tareas = seleccionarCiudades(indice, args.pais, args.ciudad)
+
+    fallidas = []
+    with ProcessPoolExecutor(max_workers=args.procesos) as executor:
+        futuros = {
+            executor.submit(exportarCiudad, pais, ciudad, lat, lng, args.desde, args.hasta,
+                            args.salida, args.formato, args.reintentos, args.variables): (pais, ciudad)
+            for pais, ciudad, lat, lng in tareas
+        }
+
+        for n, futuro in enumerate(as_completed(futuros), start=1):
+            pais, ciudad = futuros[futuro]
+            try:
+                ruta = futuro.result()
+                print(f"[{n}/{len(tareas)}] {pais}, {ciudad}: {ruta}")
+            except Exception as error:
+                fallidas.append((pais, ciudad))
+                print(f"[{n}/{len(tareas)}] {pais}, {ciudad}: ERROR {error}", file=sys.stderr)
+
+    if fallidas:
+        print(f"{len(fallidas)} ciudades fallaron; vuelva a ejecutar el mismo comando para reanudar.",
+              file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa índices agroclimáticos calculados de forma vectorizada
+a partir del historial diario: grados día de crecimiento, evapotranspiración de
+referencia por Hargreaves (FAO-56), días con helada y con estrés térmico y el
+déficit de precipitación acumulado. Las funciones trabajan sobre arrays de
+NumPy con broadcasting, de modo que una matriz (días, ciudades) con un vector
+de latitudes calcula todas las ciudades a la vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Constante solar en MJ m-2 min-1 (FAO-56)
+CONSTANTE_SOLAR = 0.0820
+
+# Conversión de MJ m-2 día-1 a mm día-1 de agua evaporada (FAO-56)
+MJ_A_MM = 0.408
+
+# Umbrales por defecto
+TEMPERATURA_BASE = 10.0
+TEMPERATURA_TOPE = 30.0
+UMBRAL_HELADA = 0.0
+UMBRAL_ESTRES_TERMICO = 35.0
+
+
+def diaDelAnio(fechas):
+    """
+    Devuelve el día del año (1 a 366) de un array o serie de fechas.
+    """
+    return pd.DatetimeIndex(np.asarray(fechas, dtype='datetime64[ns]')).dayofyear.to_numpy()
+
+
+def radiacionExtraterrestre(latitud, dia_anio):
+    """
+    Radiación extraterrestre diaria Ra en MJ m-2 día-1 (FAO-56, ecuación 21) para
+    latitudes en grados y días del año; ambos argumentos se combinan por broadcasting.
+    """
+    phi = np.radians(np.asarray(latitud, dtype=np.float64))
+    angulo = 2 * np.pi * np.asarray(dia_anio, dtype=np.float64) / 365
+
+    # Distancia relativa inversa Tierra-Sol y declinación solar
+    dr = 1 + 0.033 * np.cos(angulo)
+    delta = 0.409 * np.sin(angulo - 1.39)
+
+    # Ángulo horario de la puesta del sol (acotado para días o noches polares)
+    omega = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1, 1))
+
+    return (24 * 60 / np.pi * CONSTANTE_SOLAR * dr
+            * (omega * np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.sin(omega)))
+
+
+def gradosDia(tmax, tmin, base=TEMPERATURA_BASE, tope=TEMPERATURA_TOPE):
+    """
+    Grados día de crecimiento por el método de temperaturas acotadas: la máxima se
+    limita al tope y la mínima a la base antes de promediar.
+    """
+    tmax = np.minimum(np.asarray(tmax, dtype=np.float64), tope)
+    tmin = np.maximum(np.asarray(tmin, dtype=np.float64), base)
+
+    return np.maximum((tmax + tmin) / 2 - base, 0)
+
+
+def evapotranspiracionHargreaves(tmax, tmin, ra):
+    """
+    Evapotranspiración de referencia ET0 en mm día-1 por la ecuación de Hargreaves
+    (FAO-56, ecuación 52), con Ra en MJ m-2 día-1.
+    """
+    tmax = np.asarray(tmax, dtype=np.float64)
+    tmin = np.asarray(tmin, dtype=np.float64)
+    tmedia = (tmax + tmin) / 2
+
+    return 0.0023 * (tmedia + 17.8) * np.sqrt(np.maximum(tmax - tmin, 0)) * MJ_A_MM * ra
+
+
+def diasHelada(tmin, umbral=UMBRAL_HELADA, axis=0):
+    """
+    Cantidad de días con temperatura mínima por debajo del umbral.
+    """
+    return (np.asarray(tmin, dtype=np.float64) < umbral).sum(axis=axis)
+
+
+def diasEstresTermico(tmax, umbral=UMBRAL_ESTRES_TERMICO, axis=0):
+    """
+    Cantidad de días con temperatura máxima igual o superior al umbral.
+    """
+    return (np.asarray(tmax, dtype=np.float64) >= umbral).sum(axis=axis)
+
+
+def deficitAcumulado(precipitacion, et0, axis=0):
+    """
+    Déficit de precipitación acumulado (ET0 - precipitación) a lo largo del eje de
+    días; los valores positivos indican más demanda de agua que lluvia.
+    """
+    diferencia = np.asarray(et0, dtype=np.float64) - np.asarray(precipitacion, dtype=np.float64)
+
+    return np.nancumsum(diferencia, axis=axis)
+
+
+def calcularIndices(df, latitud=None, base=TEMPERATURA_BASE, tope=TEMPERATURA_TOPE,
+                    umbral_helada=UMBRAL_HELADA, umbral_estres=UMBRAL_ESTRES_TERMICO):
+    """
+    Calcula los índices diarios de un historial indexado por fecha. La latitud puede
+    ser un número, un diccionario {ubicación: latitud} para historiales con columna
+    'ubicacion', o no indicarse si el historial tiene columna 'latitude'. Los valores
+    acumulados se reinician por ubicación.
+    """
+    fechas = df.index if isinstance(df.index, pd.DatetimeIndex) else df['date']
+    tmax = df['temperature_2m_max'].to_numpy(dtype=np.float64)
+    tmin = df['temperature_2m_min'].to_numpy(dtype=np.float64)
+
+    if latitud is None:
+        latitud = df['latitude'].to_numpy(dtype=np.float64)
+    elif isinstance(latitud, dict):
+        latitud = df['ubicacion'].map(latitud).to_numpy(dtype=np.float64)
+
+    ra = radiacionExtraterrestre(latitud, diaDelAnio(fechas))
+    resultado = pd.DataFrame({
+        'grados_dia': gradosDia(tmax, tmin, base, tope),
+        'et0': evapotranspiracionHargreaves(tmax, tmin, ra),
+        'helada': tmin < umbral_helada,
+        'estres_termico': tmax >= umbral_estres,
+    }, index=df.index)
+    resultado['balance'] = resultado['et0'] - df['precipitation_sum']
+
+    # Acumulados por ubicación (o de toda la serie si es una sola)
+    grupos = df['ubicacion'] if 'ubicacion' in df else np.zeros(len(df), dtype=np.int8)
+    acumulados = resultado[['grados_dia', 'balance']].groupby(grupos, sort=False).cumsum()
+    resultado['grados_dia_acumulados'] = acumulados['grados_dia']
+    resultado['deficit_acumulado'] = acumulados['balance']
+
+    if 'ubicacion' in df:
+        resultado.insert(0, 'ubicacion', df['ubicacion'])
+
+    return resultado.drop(columns='balance')
+
+
+def resumenIndices(indices):
+    """
+    Resume los índices diarios por ubicación: totales de grados día y ET0, días con
+    helada y con estrés térmico y el déficit acumulado al final del período. La ET0
+    de una ubicación sin latitud conocida queda vacía en lugar de sumar 0.
+    """
+    grupos = indices['ubicacion'] if 'ubicacion' in indices else pd.Series('', index=indices.index)
+
+    resumen = indices.groupby(grupos, sort=False).agg(
+        grados_dia=('grados_dia', 'sum'),
+        dias_helada=('helada', 'sum'),
+        dias_estres_termico=('estres_termico', 'sum'),
+        deficit_acumulado=('deficit_acumulado', 'last'),
+    )
+    resumen.insert(1, 'et0', indices['et0'].groupby(grupos, sort=False).sum(min_count=1))
+
+    return resumen
@@ -0,0 +1,301 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa la instrumentación de la aplicación: histogramas de
+latencia por operación, contadores (bytes transferidos, respuestas de red y de
+caché), pico de memoria opcional con tracemalloc y un perfilador por muestreo
+que guarda las pilas en formato colapsado, el que leen flamegraph.pl y
+speedscope. Las mediciones se ven en la página oculta de diagnóstico.
+
+Uso:
+    @metricas.medir()
+    def funcion(): ...
+
+    with metricas.medir("pandas.resumen"):
+        ...
+"""
+
+import bisect
+import functools
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Límites superiores (ms) de los intervalos de los histogramas de latencia
+LIMITES_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf]
+
+# Intervalo entre muestras del perfilador (segundos)
+INTERVALO_MUESTREO = 0.005
+
+
+class Histograma:
+    """
+    Histograma de latencias con intervalos fijos, cantidad, total, mínimo y máximo.
+    """
+
+    def __init__(self, limites=LIMITES_MS):
+        self.limites = limites
+        self.cuentas = [0] * len(limites)
+        self.cantidad = 0
+        self.total = 0.0
+        self.minimo = math.inf
+        self.maximo = 0.0
+
+    def registrar(self, ms):
+        self.cuentas[bisect.bisect_left(self.limites, ms)] += 1
+        self.cantidad += 1
+        self.total += ms
+        self.minimo = min(self.minimo, ms)
+        self.maximo = max(self.maximo, ms)
+
+    def percentil(self, q):
+        """
+        Estima un percentil (0 a 1) como el límite superior del intervalo que lo contiene.
+        """
+        if not self.cantidad:
+            return 0.0
+
+        objetivo, acumulado = q * self.cantidad, 0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+
+        return self.maximo
+
+    def resumen(self):
+        return {
+            "cantidad": self.cantidad,
+            "total_ms": self.total,
+            "media_ms": self.total / self.cantidad if self.cantidad else 0.0,
+            "min_ms": self.minimo if self.cantidad else 0.0,
+            "p50_ms": self.percentil(0.5),
+            "p90_ms": self.percentil(0.9),
+            "p99_ms": self.percentil(0.99),
+            "max_ms": self.maximo,
+            "intervalos": {f"<={limite}": cuenta for limite, cuenta in zip(self.limites, self.cuentas) if cuenta},
+        }
+
+
+class _Medicion:
+    """
+    Mide el tiempo (y, si está activado, el pico de memoria) de un bloque o de
+    cada llamada a una función decorada.
+    """
+
+    def __init__(self, registro, nombre):
+        self.registro = registro
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.registro._entrar()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        ms = (time.perf_counter() - self._inicio) * 1000
+        self.registro._salir(self.nombre, ms)
+
+    def __call__(self, funcion):
+        nombre = self.nombre or f"{funcion.__module__}.{funcion.__name__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with _Medicion(self.registro, nombre):
+                return funcion(*args, **kwargs)
+
+        return envoltura
+
+
+class Registro:
+    """
+    Registro de mediciones del proceso, seguro entre hilos.
+
+    El pico de memoria se mide solo después de `activarMemoria()`, porque
+    tracemalloc enlentece toda la ejecución. Es aproximado cuando varios hilos
+    miden a la vez, ya que tracemalloc sigue la memoria de todo el proceso.
+    """
+
+    def __init__(self):
+        self._bloqueo = threading.Lock()
+        self._local = threading.local()
+        self.latencias = {}
+        self.contadores = Counter()
+        self.memoria = {}
+        self.medir_memoria = False
+
+    def medir(self, nombre=None):
+        """
+        Devuelve un medidor usable como decorador (por defecto con el nombre
+        modulo.funcion) o como administrador de contexto (con nombre obligatorio).
+        """
+        return _Medicion(self, nombre)
+
+    def contar(self, nombre, cantidad=1):
+        """
+        Suma `cantidad` al contador indicado.
+        """
+        with self._bloqueo:
+            self.contadores[nombre] += cantidad
+
+    def activarMemoria(self, activar=True):
+        """
+        Activa o desactiva la medición del pico de memoria de cada operación.
+        """
+        if activar and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not activar and self.medir_memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.medir_memoria = activar
+
+    def _entrar(self):
+        if not (self.medir_memoria and tracemalloc.is_tracing()):
+            return
+
+        # Cada nivel anidado guarda su pico antes de que el interior lo reinicie
+        pila = self._local.__dict__.setdefault('pila', [])
+        actual, pico = tracemalloc.get_traced_memory()
+        if pila:
+            pila[-1][1] = max(pila[-1][1], pico)
+        tracemalloc.reset_peak()
+        pila.append([actual, actual])
+
+    def _salir(self, nombre, ms):
+        pila = getattr(self._local, 'pila', None)
+        pico = None
+        if pila:
+            base, pico = pila.pop()
+            pico = max(pico, tracemalloc.get_traced_memory()[1]) if tracemalloc.is_tracing() else pico
+            if pila:
+                pila[-1][1] = max(pila[-1][1], pico)
+            pico -= base
+
+        with self._bloqueo:
+            histograma = self.latencias.get(nombre)
+            if histograma is None:
+                histograma = self.latencias[nombre] = Histograma()
+            histograma.registrar(ms)
+            if pico is not None:
+                self.memoria[nombre] = max(self.memoria.get(nombre, 0), pico)
+
+    def instantanea(self):
+        """
+        Devuelve un diccionario con el resumen de cada histograma, los contadores y
+        el pico de memoria (bytes) de cada operación.
+        """
+        with self._bloqueo:
+            return {
+                "latencias": {nombre: h.resumen() for nombre, h in sorted(self.latencias.items())},
+                "contadores": dict(sorted(self.contadores.items())),
+                "memoria": dict(sorted(self.memoria.items())),
+            }
+
+    def reiniciar(self):
+        with self._bloqueo:
+            self.latencias.clear()
+            self.contadores.clear()
+            self.memoria.clear()
+
+
+# Registro del proceso, compartido por todas las sesiones
+registro = Registro()
+medir = registro.medir
+contar = registro.contar
+
+
+def ganchoRespuestas(servicio):
+    """
+    Devuelve un gancho de respuesta de requests que cuenta, para el servicio
+    indicado, las respuestas y los bytes recibidos por la red y los servidos
+    desde la caché de requests_cache.
+    """
+    def gancho(respuesta, *args, **kwargs):
+        if getattr(respuesta, 'from_cache', False):
+            origen = "cache"
+        elif getattr(respuesta, '_contada', False):
+            return respuesta  # La sesión con caché vuelve a llamar al gancho
+        else:
+            origen = "red"
+            respuesta._contada = True
+
+        contar(f"http.{servicio}.{origen}")
+        contar(f"http.{servicio}.{origen}.bytes", len(respuesta.content or b""))
+        return respuesta
+
+    return gancho
+
+
+class Perfilador:
+    """
+    Perfilador por muestreo: un hilo toma cada `intervalo` segundos la pila de
+    todos los demás hilos y cuenta las pilas repetidas. El resultado se guarda en
+    formato colapsado ("func (archivo:línea);func ... cantidad"), una línea por pila.
+    """
+
+    def __init__(self, intervalo=INTERVALO_MUESTREO):
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        if self.activo:
+            return self
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+        self._hilo.start()
+
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+        return self
+
+    def _muestrear(self):
+        propio = threading.get_ident()
+        nombres = {}
+        while not self._detener.wait(self.intervalo):
+            for hilo, cuadro in sys._current_frames().items():
+                if hilo == propio:
+                    continue
+                pila = []
+                while cuadro is not None:
+                    codigo = cuadro.f_code
+                    clave = (codigo.co_name, codigo.co_filename, codigo.co_firstlineno)
+                    if clave not in nombres:
+                        nombres[clave] = f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:" \
+                                         f"{codigo.co_firstlineno})"
+                    pila.append(nombres[clave])
+                    cuadro = cuadro.f_back
+                self.pilas[';'.join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def colapsadas(self):
+        """
+        Devuelve las pilas en formato colapsado, de la más frecuente a la menos.
+        """
+        return ''.join(f"{pila} {cantidad}\n" for pila, cantidad in self.pilas.most_common())
+
+    def guardar(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.colapsadas())
+
+
+# Perfilador del proceso, controlado desde la página de diagnóstico
+perfilador = Perfilador()
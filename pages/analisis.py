@@ -12,6 +12,7 @@ y manipulación de datos meteorológicos.
 
 import streamlit as st
 import utils as utl
+import indices
 import pandas as pd
 
 # Configuración inicial de la página
@@ -37,9 +38,10 @@ utl.generarMenu()
 
 # Carga de archivo CSV
 uploaded_files = st.file_uploader(
-    label=":date: Seleccione el archivo CSV a analizar",
-    type=["csv"],
-    help="Seleccione el archivo descargado con los datos"
+    label=":date: Seleccione los archivos a analizar",
+    type=["csv", "gz", "zst", "parquet", "xlsx"],
+    accept_multiple_files=True,
+    help="Seleccione uno o varios archivos descargados con los datos (CSV, CSV comprimido, Parquet o Excel)"
 )
 
 # Procesamiento de datos si se carga un archivo
@@ -49,16 +51,37 @@ if uploaded_files:
     # Obtener un dataframe desde el archivo
     df_clima = utl.cargarHistorialDesdeArchivos(uploaded_files)
 
+    # Los archivos renombrados no indican su ubicación: cada uno se analiza por separado
+    sin_ubicacion = utl.archivosSinUbicacion(uploaded_files)
+    if sin_ubicacion and len(uploaded_files) > 1:
+        st.warning(
+            ":grey_question: No se pudo reconocer la ubicación de "
+            f"{', '.join(sin_ubicacion)} (el nombre no sigue el formato País_Ciudad_desde_hasta). "
+            "Cada uno se analiza como una ubicación aparte y sus días no se combinan con otros archivos."
+        )
+
     # Visualización y edición de datos
     df_clima = st.data_editor(df_clima, height=300)
 
+    # Preparación única de los datos para estadísticas y gráficos
+    df_preparado = utl.prepararDatos(df_clima)
+
     st.divider()
 
+    # Con varias ubicaciones, las estadísticas y los gráficos se calculan para una sola
+    if 'ubicacion' in df_preparado:
+        ubicacion = st.selectbox("Ubicación a analizar", df_preparado['ubicacion'].unique())
+        df_ubicacion = df_preparado[df_preparado['ubicacion'] == ubicacion].drop(columns='ubicacion')
+        nombre_analisis = ubicacion
+    else:
+        df_ubicacion = df_preparado
+        nombre_analisis = ', '.join(archivo.name for archivo in uploaded_files)
+
      # Sección de estadísticas
-    st.subheader(f":triangular_ruler: Estadisticas para {uploaded_files.name}")
+    st.subheader(f":triangular_ruler: Estadisticas para {nombre_analisis}")
 
     # Obtener el estadisticas en un dicccionario
-    estadisticas = utl.obtenerDatosEstadisticos(df_clima)
+    estadisticas = utl.obtenerDatosEstadisticos(df_ubicacion)
 
     # Visualización de estadísticas en dos columnas
     col1, col2 = st.columns(2)
@@ -73,18 +96,80 @@ if uploaded_files:
         st.info(f":ocean: La precipitación media registrada es: {estadisticas['precipitacion_media']}")
         st.info(f":fog: La velocidad media de viento registrada es: {estadisticas['viento_media']}")
 
+    # Sección de índices agroclimáticos
+    st.divider()
+    st.subheader(":seedling: Índices agroclimáticos")
+
+    # La latitud (necesaria para la evapotranspiración) se toma del nombre del archivo
+    latitudes = utl.latitudesArchivos(uploaded_files)
+    if 'ubicacion' in df_preparado:
+        latitud = latitudes
+        sin_latitud = [u for u in df_preparado['ubicacion'].unique() if u not in latitudes]
+        if sin_latitud:
+            st.warning(f":round_pushpin: No se encontró la latitud de {', '.join(sin_latitud)}: "
+                       "su evapotranspiración y su déficit hídrico no se pueden calcular.")
+    else:
+        latitud = st.number_input("Latitud de la ubicación", min_value=-90.0, max_value=90.0,
+                                  value=next(iter(latitudes.values()), None), placeholder="Sin latitud")
+        if latitud is None:
+            st.warning(":round_pushpin: No se encontró la latitud de la ubicación: indíquela para calcular "
+                       "la evapotranspiración y el déficit hídrico.")
+            latitud = float('nan')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        base = st.number_input("Temperatura base para grados día (°C)", value=indices.TEMPERATURA_BASE)
+    with col2:
+        umbral_estres = st.number_input("Umbral de estrés térmico (°C)",
+                                        value=indices.UMBRAL_ESTRES_TERMICO)
+
+    indices_diarios = indices.calcularIndices(df_preparado, latitud, base=base,
+                                              umbral_estres=umbral_estres)
+    resumen = indices.resumenIndices(indices_diarios).rename(columns={
+        'grados_dia': 'Grados día',
+        'et0': 'ET0 total (mm)',
+        'dias_helada': 'Días con helada',
+        'dias_estres_termico': 'Días con estrés térmico',
+        'deficit_acumulado': 'Déficit hídrico acumulado (mm)',
+    })
+    st.dataframe(resumen.round(1), use_container_width=True, hide_index='ubicacion' not in df_preparado)
+
     # Sección de gráficos
     st.divider()
+    interactivo = st.toggle(
+        "Gráficos interactivos",
+        help="Envía al navegador solo los datos de cada gráfico en lugar de imágenes"
+    )
+    huella = utl.huellaDatos(df_ubicacion)
+
     st.subheader(":male-scientist: Gráfico de la evolución climática")
-    st.pyplot(utl.mostrarGraficoTemperatura(df_clima))
+    if interactivo:
+        st.line_chart(utl.datosGraficoTemperatura(df_ubicacion))
+    else:
+        st.image(utl.renderizarGrafico(utl.mostrarGraficoTemperatura, df_ubicacion, huella),
+                 use_column_width=True)
 
     st.divider()
     st.subheader(":sunny: Gráfico de la evolución de la luz solar mensual")
-    st.pyplot(utl.mostrarGraficoLuz(df_clima))
+    if interactivo:
+        luz = utl.datosGraficoLuz(df_ubicacion)
+        luz.index = utl.MESES
+        st.bar_chart(luz[['sunshine_duration', 'cloudy_duration']].rename(columns={
+            'sunshine_duration': 'Luz directa del sol',
+            'cloudy_duration': 'Luz sin sol directo'
+        }))
+    else:
+        st.image(utl.renderizarGrafico(utl.mostrarGraficoLuz, df_ubicacion, huella),
+                 use_column_width=True)
 
     st.divider()
     st.subheader(":warning: Gráfico de la exposición de la luz solar y la radiacción")
-    st.pyplot(utl.mostrarGraficoRadiacion(df_clima))
+    if interactivo:
+        st.scatter_chart(utl.datosGraficoRadiacion(df_ubicacion),
+                         x='sunshine_duration', y='shortwave_radiation_sum')
+    else:
+        st.image(utl.renderizarGrafico(utl.mostrarGraficoRadiacion, df_ubicacion, huella),
+                 use_column_width=True)
 
 else:
     st.info('Esperando por el archivo...')
@@ -0,0 +1,143 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa la página de diagnóstico, que no figura en el menú y se
+abre directamente en /diagnostico. Muestra las latencias por operación, los
+aciertos de las cachés, los bytes transferidos, el pico de memoria y el estado
+del programador de solicitudes, y permite descargar las métricas en JSON y las
+pilas del perfilador por muestreo en formato colapsado.
+
+Los controles que modifican el proceso (medición de memoria, reinicio de las
+métricas y perfilador) solo se habilitan con la variable de entorno
+DIAGNOSTICO_CONTROLES=1 o con `diagnostico_controles = true` en los secretos.
+"""
+
+import json
+import os
+import streamlit as st
+import pandas as pd
+import utils as utl
+import api
+import metricas
+
+# Configuración inicial de la página
+st.set_page_config(
+    page_title="Sistema de Análisis Climático",
+    layout="wide",
+)
+
+# Generación del menú de navegación
+utl.generarMenu()
+
+
+def controlesHabilitados():
+    """
+    Indica si la página puede modificar la instrumentación, que es compartida por
+    todas las sesiones del proceso.
+    """
+    if os.environ.get("DIAGNOSTICO_CONTROLES") == "1":
+        return True
+
+    try:
+        return bool(st.secrets.get("diagnostico_controles", False))
+    except FileNotFoundError:
+        return False
+
+
+controles = controlesHabilitados()
+
+st.title(":stethoscope: Diagnóstico")
+
+instantanea = metricas.registro.instantanea()
+contadores = instantanea["contadores"]
+
+# Controles de la instrumentación
+if not controles:
+    st.caption("Los controles están deshabilitados: se activan con la variable de entorno "
+               "DIAGNOSTICO_CONTROLES=1 o con `diagnostico_controles = true` en los secretos.")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    memoria = st.toggle("Medir pico de memoria", value=metricas.registro.medir_memoria, disabled=not controles,
+                        help="Activa tracemalloc, que enlentece toda la aplicación")
+    if controles and memoria != metricas.registro.medir_memoria:
+        metricas.registro.activarMemoria(memoria)
+with col2:
+    if st.button("Reiniciar métricas", disabled=not controles):
+        metricas.registro.reiniciar()
+        st.rerun()
+with col3:
+    st.download_button("Descargar métricas (JSON)", file_name="metricas.json", mime="application/json",
+                       data=json.dumps({
+                           **instantanea,
+                           "cache_pronosticos": api.estadisticasCache(),
+                           "cache_graficos": utl.cache_graficos.estadisticas(),
+                           "renovador": api.estadisticasRenovador(),
+                           "programador": api.estadisticasProgramador(),
+                       }, indent=2, default=str))
+
+st.divider()
+
+# Latencias por operación, de la que más tiempo acumula a la que menos
+st.subheader(":stopwatch: Latencias")
+if instantanea["latencias"]:
+    latencias = pd.DataFrame.from_dict(instantanea["latencias"], orient="index").drop(columns="intervalos")
+    latencias["pico_memoria_mb"] = pd.Series(instantanea["memoria"], dtype=float) / 2 ** 20
+    st.dataframe(latencias.sort_values("total_ms", ascending=False), use_container_width=True)
+else:
+    st.info("Todavía no hay mediciones en este proceso.")
+
+# Aciertos de las cachés
+st.subheader(":card_file_box: Cachés")
+
+
+def filaHttp(servicio):
+    red, cache = contadores.get(f"http.{servicio}.red", 0), contadores.get(f"http.{servicio}.cache", 0)
+    return {"aciertos": cache, "fallos": red,
+            "tasa_aciertos": cache / (red + cache) if red + cache else 0.0,
+            "bytes_red": contadores.get(f"http.{servicio}.red.bytes", 0),
+            "bytes_cache": contadores.get(f"http.{servicio}.cache.bytes", 0)}
+
+
+caches = pd.DataFrame.from_dict({
+    "Pronósticos (memoria)": api.estadisticasCache(),
+    "Gráficos (memoria)": utl.cache_graficos.estadisticas(),
+    "Archivo (HTTP)": filaHttp("archivo"),
+    "Pronóstico (HTTP)": filaHttp("pronostico"),
+}, orient="index")
+st.dataframe(caches, use_container_width=True)
+
+# Programador de solicitudes y renovación de pronósticos
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader(":vertical_traffic_light: Programador")
+    st.json(api.estadisticasProgramador())
+with col2:
+    st.subheader(":arrows_counterclockwise: Renovador")
+    st.json(api.estadisticasRenovador())
+
+st.divider()
+
+# Perfilador por muestreo
+st.subheader(":fire: Perfilador")
+perfilador = metricas.perfilador
+st.write(f"Estado: {'activo' if perfilador.activo else 'detenido'}, {perfilador.muestras} muestras, "
+         f"{len(perfilador.pilas)} pilas distintas.")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    if st.button("Iniciar", disabled=not controles or perfilador.activo):
+        perfilador.iniciar()
+        st.rerun()
+with col2:
+    if st.button("Detener", disabled=not controles or not perfilador.activo):
+        perfilador.detener()
+        st.rerun()
+with col3:
+    st.download_button("Descargar pilas", data=perfilador.colapsadas(), file_name="pilas.txt",
+                       mime="text/plain", disabled=not perfilador.pilas,
+                       help="Formato colapsado para flamegraph.pl o speedscope")
@@ -0,0 +1,121 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa el planificador de solicitudes al archivo de Open-Meteo.
+Dadas las variables, ubicaciones y el rango de fechas pedidos, consulta el
+almacén local para saber qué falta, agrupa en una misma solicitud las
+ubicaciones a las que les falta lo mismo, divide las solicitudes para respetar
+los límites por llamada (ubicaciones, variables y días), y combina lo
+descargado con lo almacenado.
+"""
+
+import math
+from collections import namedtuple
+import pandas as pd
+import almacen
+import programador
+
+# Límites por solicitud
+MAX_UBICACIONES = 50
+MAX_VARIABLES = 10
+MAX_DIAS = 3660
+
+Solicitud = namedtuple('Solicitud', ['ubicaciones', 'desde', 'hasta', 'variables'])
+
+
+def dividirLista(elementos, tamano):
+    """
+    Divide una lista en bloques consecutivos de hasta `tamano` elementos.
+    """
+    return [elementos[i:i + tamano] for i in range(0, len(elementos), tamano)]
+
+
+def dividirRango(desde, hasta, max_dias):
+    """
+    Divide un rango de fechas (AAAA-MM-DD, ambas inclusive) en tramos de hasta `max_dias` días.
+    """
+    dias = almacen.rangoDias(desde, hasta)
+
+    return [(str(bloque[0]), str(bloque[-1])) for bloque in dividirLista(dias, max_dias)]
+
+
+def planificarSolicitudes(faltantes, max_ubicaciones=MAX_UBICACIONES, max_variables=MAX_VARIABLES,
+                          max_dias=MAX_DIAS, max_peso=None):
+    """
+    Arma la lista de solicitudes a partir de lo que le falta a cada ubicación.
+
+    `faltantes` es un diccionario {(lat, lng): [(desde, hasta, variables), ...]}. Las
+    ubicaciones con el mismo tramo y las mismas variables faltantes comparten solicitud.
+    Con `max_peso` además se achican las solicitudes para que ninguna consuma más
+    fichas que esas (ver programador.pesoSolicitud).
+    """
+    grupos = {}
+    for ubicacion, tramos in faltantes.items():
+        for desde, hasta, variables in tramos:
+            grupos.setdefault((desde, hasta, tuple(variables)), []).append(ubicacion)
+
+    plan = []
+    for (desde, hasta, variables), ubicaciones in grupos.items():
+        for bloque_variables in dividirLista(list(variables), max_variables):
+            peso_variables = math.ceil(len(bloque_variables) / programador.VARIABLES_POR_LLAMADA)
+            por_solicitud = max_ubicaciones
+            if max_peso is not None:
+                por_solicitud = max(1, min(max_ubicaciones, int(max_peso // peso_variables)))
+
+            for bloque_ubicaciones in dividirLista(ubicaciones, por_solicitud):
+                dias = max_dias
+                if max_peso is not None:
+                    tramos = int(max_peso // (len(bloque_ubicaciones) * peso_variables))
+                    dias = min(max_dias, programador.DIAS_POR_LLAMADA * max(1, tramos))
+
+                for inicio, fin in dividirRango(desde, hasta, dias):
+                    plan.append(Solicitud(bloque_ubicaciones, inicio, fin, bloque_variables))
+
+    return plan
+
+
+def obtenerHistorial(ubicaciones, fecha_inicio, fecha_final, variables, descargar, formato="largo",
+                     **limites):
+    """
+    Devuelve el historial diario de varias ubicaciones descargando solo lo que no
+    está en el almacén.
+
+    `descargar(ubicaciones, desde, hasta, variables)` debe devolver una lista con un
+    DataFrame por ubicación, en el mismo orden. Con formato "largo" el resultado es un
+    único DataFrame con las columnas 'ubicacion', 'latitude' y 'longitude'; con formato
+    "dict" es un diccionario {(lat, lng): DataFrame}.
+    """
+    if formato not in ("largo", "dict"):
+        raise ValueError(f"Formato desconocido: {formato}")
+
+    ubicaciones = list(dict.fromkeys((float(lat), float(lng)) for lat, lng in ubicaciones))
+
+    faltantes = {ubicacion: almacen.faltantesUbicacion(*ubicacion, fecha_inicio, fecha_final, variables)
+                 for ubicacion in ubicaciones}
+
+    for solicitud in planificarSolicitudes(faltantes, **limites):
+        descargados = descargar(solicitud.ubicaciones, solicitud.desde, solicitud.hasta,
+                                solicitud.variables)
+        for (lat, lng), nuevos in zip(solicitud.ubicaciones, descargados):
+            almacen.guardarDescarga(lat, lng, nuevos, solicitud.variables)
+
+    resultados = {ubicacion: almacen.leerRango(*ubicacion, fecha_inicio, fecha_final, variables)
+                  for ubicacion in ubicaciones}
+    if formato == "dict":
+        return resultados
+
+    frames = []
+    for (lat, lng), df in resultados.items():
+        df.insert(0, "ubicacion", almacen.claveUbicacion(lat, lng))
+        df.insert(1, "latitude", lat)
+        df.insert(2, "longitude", lng)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["ubicacion", "latitude", "longitude", "date", *variables])
+
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,365 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa el programador de solicitudes a Open-Meteo: limita el
+ritmo de cada servicio con un cubo de fichas compartido por todos los hilos y
+procesos del equipo (guardado en SQLite), atiende primero las solicitudes de la
+interfaz y después las masivas, y agrupa las solicitudes idénticas que están en
+curso para que compartan una sola llamada.
+
+Uso:
+    programador = Programador([(r"/v1/archive", 5, 50)])
+    sesion.mount("https://", AdaptadorProgramado(programador))
+
+    with programador.prioridad(MASIVA):
+        ...  # Las solicitudes de este hilo ceden el paso a las de la interfaz
+"""
+
+import heapq
+import itertools
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date
+from urllib.parse import urlparse, parse_qs
+
+from requests.adapters import HTTPAdapter
+
+# Carriles de prioridad: un número menor se atiende antes
+INTERACTIVA = "interactiva"
+MASIVA = "masiva"
+CARRILES = {INTERACTIVA: 0, MASIVA: 1}
+
+# Archivo con el estado de los cubos compartido entre procesos
+ARCHIVO_ESTADO = '.programador.sqlite'
+
+# Fracción de cada cubo que las solicitudes masivas no pueden consumir, para que
+# la interfaz tenga fichas disponibles aunque haya una exportación en curso
+RESERVA_INTERACTIVA = 0.2
+
+# Open-Meteo cuenta una llamada más por cada tramo de días y de variables
+DIAS_POR_LLAMADA = 14
+VARIABLES_POR_LLAMADA = 10
+DIAS_PRONOSTICO = 7
+
+
+def pesoSolicitud(url):
+    """
+    Devuelve cuántas fichas consume una solicitud, como las cuenta Open-Meteo:
+    coordenadas × tramos de 14 días × tramos de 10 variables.
+    """
+    consulta = parse_qs(urlparse(url).query)
+
+    def valores(nombre):
+        return [valor for item in consulta.get(nombre, []) for valor in item.split(',') if valor]
+
+    try:
+        if valores('start_date') and valores('end_date'):
+            dias = (date.fromisoformat(valores('end_date')[0])
+                    - date.fromisoformat(valores('start_date')[0])).days + 1
+        else:
+            dias = int((valores('forecast_days') or [DIAS_PRONOSTICO])[0]) + int((valores('past_days') or [0])[0])
+    except ValueError:
+        dias = 1
+
+    ubicaciones = len(valores('latitude'))
+    variables = sum(len(valores(nombre)) for nombre in ('hourly', 'daily', 'current', 'minutely_15'))
+
+    return (max(1, ubicaciones) * max(1, math.ceil(dias / DIAS_POR_LLAMADA))
+            * max(1, math.ceil(variables / VARIABLES_POR_LLAMADA)))
+
+
+class CuboTokens:
+    """
+    Cubo de fichas con recarga continua (`tasa` fichas por segundo, hasta
+    `capacidad`) cuyo estado se guarda en SQLite, de modo que varios procesos del
+    mismo equipo compartan el límite. Con `ruta` None el cubo es local al proceso.
+    """
+
+    def __init__(self, nombre, tasa, capacidad, ruta=ARCHIVO_ESTADO):
+        self.nombre = nombre
+        self.tasa = float(tasa)
+        self.capacidad = float(capacidad)
+        self.ruta = ruta
+        self._bloqueo = threading.Lock()
+        self._conexion = None
+        self._pid = None
+
+    def conexion(self):
+        """
+        Devuelve la conexión a la base de estado, abriendo una nueva en cada proceso.
+        """
+        if self._pid != os.getpid():
+            conexion = sqlite3.connect(self.ruta or ':memory:', timeout=30, isolation_level=None,
+                                       check_same_thread=False)
+            conexion.execute("CREATE TABLE IF NOT EXISTS cubos "
+                             "(nombre TEXT PRIMARY KEY, fichas REAL, instante REAL)")
+            self._conexion, self._pid = conexion, os.getpid()
+
+        return self._conexion
+
+    def _recargadas(self, fila, ahora):
+        """
+        Calcula las fichas disponibles a partir del último estado guardado.
+        """
+        if fila is None:
+            return self.capacidad
+
+        fichas, instante = fila
+        return min(self.capacidad, fichas + max(0.0, ahora - instante) * self.tasa)
+
+    def tomar(self, peso=1, reserva=0.0):
+        """
+        Intenta tomar `peso` fichas dejando al menos `reserva` en el cubo. Devuelve 0
+        si las tomó, o los segundos que conviene esperar antes de volver a intentar.
+        Sin reserva, una solicitud más pesada que el cubo se admite con el cubo lleno
+        y lo deja en deuda; con reserva nunca se deja el cubo en deuda, y una
+        solicitud que no cabe junto a la reserva produce ValueError.
+        """
+        if reserva:
+            necesarias = peso + reserva
+            if necesarias > self.capacidad:
+                raise ValueError(f"La solicitud de {peso} fichas no cabe en el cubo {self.nombre} "
+                                 f"({self.capacidad:g} fichas, {reserva:g} reservadas): divídala")
+        else:
+            necesarias = min(peso, self.capacidad)
+
+        with self._bloqueo:
+            conexion = self.conexion()
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                fila = conexion.execute("SELECT fichas, instante FROM cubos WHERE nombre = ?",
+                                        (self.nombre,)).fetchone()
+                ahora = time.time()
+                fichas = self._recargadas(fila, ahora)
+
+                if fichas >= necesarias:
+                    fichas -= peso
+                    espera = 0.0
+                else:
+                    espera = (necesarias - fichas) / self.tasa
+
+                conexion.execute("INSERT OR REPLACE INTO cubos VALUES (?, ?, ?)",
+                                 (self.nombre, fichas, ahora))
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+
+        return espera
+
+    def disponibles(self):
+        """
+        Devuelve las fichas disponibles en este momento, sin consumirlas.
+        """
+        with self._bloqueo:
+            fila = self.conexion().execute("SELECT fichas, instante FROM cubos WHERE nombre = ?",
+                                           (self.nombre,)).fetchone()
+
+        return self._recargadas(fila, time.time())
+
+
+class Programador:
+    """
+    Ordena las solicitudes salientes por carril de prioridad y las limita con un
+    cubo de fichas por servicio. `limites` es una lista de tuplas (patrón de URL,
+    fichas por segundo, capacidad) que se evalúan en orden; las URL que no
+    coinciden con ningún patrón no se limitan. Cada servicio tiene su propia cola
+    y condición, de modo que la espera de uno no demora a los demás.
+    """
+
+    def __init__(self, limites, ruta=ARCHIVO_ESTADO, reserva=RESERVA_INTERACTIVA):
+        self.reserva = reserva
+        self.prioridad_defecto = INTERACTIVA
+
+        self._bloqueo_servicios = threading.Lock()
+        self._servicios = {}
+        self.configurarLimites(limites, ruta)
+        self._turnos = itertools.count()
+        self._local = threading.local()
+
+        self._bloqueo_curso = threading.Lock()
+        self._en_curso = {}
+
+        self._bloqueo_contadores = threading.Lock()
+        self.solicitudes = {carril: 0 for carril in CARRILES}
+        self.espera_total = {carril: 0.0 for carril in CARRILES}
+        self.agrupadas = 0
+
+    def configurarLimites(self, limites, ruta=ARCHIVO_ESTADO):
+        """
+        Reemplaza los límites por servicio; con una lista vacía no se limita ninguno.
+        """
+        with self._bloqueo_servicios:
+            self.cubos = [(re.compile(patron), CuboTokens(patron, tasa, capacidad, ruta))
+                          for patron, tasa, capacidad in limites]
+            # Cada servicio conserva su condición y su cola (con quienes ya esperan turno)
+            self._servicios = {cubo.nombre: self._servicios.get(cubo.nombre) or (threading.Condition(), [])
+                               for _, cubo in self.cubos}
+
+    def cuboDe(self, url):
+        """
+        Devuelve el cubo que limita una URL, o None si no tiene límite.
+        """
+        for patron, cubo in self.cubos:
+            if patron.search(url):
+                return cubo
+
+        return None
+
+    def pesoMaximo(self, url):
+        """
+        Devuelve el peso máximo que se admite en una solicitud del hilo actual a la
+        URL, o None si no hay máximo: las masivas deben dejar intacta la reserva de
+        la interfaz, mientras que las interactivas pueden dejar el cubo en deuda.
+        """
+        cubo = self.cuboDe(url)
+        if cubo is None or self.prioridadActual() == INTERACTIVA:
+            return None
+
+        return cubo.capacidad * (1 - self.reserva)
+
+    def prioridadActual(self):
+        """
+        Devuelve el carril del hilo actual (por defecto, `prioridad_defecto`).
+        """
+        return getattr(self._local, 'carril', None) or self.prioridad_defecto
+
+    @contextmanager
+    def prioridad(self, carril):
+        """
+        Atiende en el carril indicado las solicitudes que haga el hilo actual dentro del bloque.
+        """
+        if carril not in CARRILES:
+            raise ValueError(f"Carril desconocido: {carril}")
+
+        anterior = getattr(self._local, 'carril', None)
+        self._local.carril = carril
+        try:
+            yield
+        finally:
+            self._local.carril = anterior
+
+    def adquirir(self, url):
+        """
+        Espera el turno de una solicitud: sale cuando es la primera de la cola de su
+        servicio (las interactivas antes que las masivas, y en orden de llegada
+        dentro de cada carril) y el cubo tiene fichas. Las masivas además respetan
+        la reserva de la interfaz. Devuelve los segundos esperados.
+        """
+        cubo = self.cuboDe(url)
+        with self._bloqueo_servicios:
+            servicio = self._servicios.get(cubo.nombre) if cubo is not None else None
+        if servicio is None:
+            return 0.0
+
+        carril = self.prioridadActual()
+        peso = pesoSolicitud(url)
+        reserva = 0.0 if carril == INTERACTIVA else cubo.capacidad * self.reserva
+        turno = (CARRILES[carril], next(self._turnos))
+        inicio = time.monotonic()
+
+        condicion, cola = servicio
+        with condicion:
+            heapq.heappush(cola, turno)
+            try:
+                while True:
+                    espera = cubo.tomar(peso, reserva) if cola[0] == turno else None
+                    if espera == 0:
+                        break
+                    condicion.wait(espera)
+            finally:
+                cola.remove(turno)
+                heapq.heapify(cola)
+                condicion.notify_all()
+
+        esperado = time.monotonic() - inicio
+        with self._bloqueo_contadores:
+            self.solicitudes[carril] += 1
+            self.espera_total[carril] += esperado
+
+        return esperado
+
+    def agrupar(self, clave, funcion):
+        """
+        Ejecuta `funcion` una sola vez para todas las llamadas simultáneas con la
+        misma clave: la primera la ejecuta y las demás esperan y reciben el mismo
+        resultado (o la misma excepción).
+        """
+        with self._bloqueo_curso:
+            futuro = self._en_curso.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = self._en_curso[clave] = Future()
+            else:
+                self.agrupadas += 1
+
+        if not lider:
+            return futuro.result()
+
+        try:
+            resultado = funcion()
+            futuro.set_result(resultado)
+            return resultado
+        except BaseException as error:
+            futuro.set_exception(error)
+            raise
+        finally:
+            with self._bloqueo_curso:
+                del self._en_curso[clave]
+
+    def estadisticas(self):
+        """
+        Devuelve un diccionario con la profundidad de cada cola por carril, las
+        fichas disponibles por servicio, las solicitudes en curso y agrupadas, y las
+        solicitudes y la espera acumulada de cada carril en este proceso.
+        """
+        with self._bloqueo_servicios:
+            servicios = dict(self._servicios)
+
+        colas = {}
+        for nombre, (condicion, cola) in servicios.items():
+            with condicion:
+                colas[nombre] = {carril: sum(1 for prioridad, _ in cola if prioridad == orden)
+                                 for carril, orden in CARRILES.items()}
+
+        with self._bloqueo_contadores:
+            solicitudes = dict(self.solicitudes)
+            espera_total = dict(self.espera_total)
+
+        with self._bloqueo_curso:
+            en_curso, agrupadas = len(self._en_curso), self.agrupadas
+
+        return {
+            "en_cola": colas,
+            "fichas": {cubo.nombre: cubo.disponibles() for _, cubo in self.cubos},
+            "en_curso": en_curso,
+            "agrupadas": agrupadas,
+            "solicitudes": solicitudes,
+            "espera_total": espera_total,
+        }
+
+
+class AdaptadorProgramado(HTTPAdapter):
+    """
+    Adaptador HTTP que pide turno al programador antes de cada envío. Como se
+    monta debajo de la caché, las respuestas guardadas no consumen fichas.
+    """
+
+    def __init__(self, programador, **kwargs):
+        self.programador = programador
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.programador.adquirir(request.url)
+
+        return super().send(request, **kwargs)
@@ -0,0 +1,115 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Este módulo implementa la reducción de puntos de series temporales largas antes
+de graficarlas, limitando la cantidad de puntos al ancho de la figura sin perder
+los picos (olas de calor, lluvias extremas): mínimo/máximo por columna de
+píxeles y Largest-Triangle-Three-Buckets (LTTB).
+"""
+
+import numpy as np
+
+
+def aNumerico(x):
+    """
+    Convierte el eje x (fechas o números) a float64 para los cálculos geométricos.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+
+    return x.astype(np.float64)
+
+
+def indicesMinMax(x, y, buckets):
+    """
+    Divide el eje x en `buckets` intervalos iguales y conserva, en cada uno, el
+    punto mínimo y el máximo. Devuelve los índices ordenados de los puntos elegidos.
+    """
+    xn, y = aNumerico(x), np.asarray(y, dtype=np.float64)
+    validos = np.flatnonzero(~np.isnan(y))
+    if len(validos) <= 2 * buckets:
+        return validos
+
+    xv = xn[validos]
+    rango = xv[-1] - xv[0]
+    if rango == 0:
+        bucket = np.zeros(len(validos), dtype=np.int64)
+    else:
+        bucket = np.minimum(((xv - xv[0]) / rango * buckets).astype(np.int64), buckets - 1)
+
+    # Ordenando por (bucket, y) el primero de cada bucket es el mínimo y el último el máximo
+    orden = np.lexsort((y[validos], bucket))
+    bucket_ordenado = bucket[orden]
+    primeros = np.flatnonzero(np.r_[True, bucket_ordenado[1:] != bucket_ordenado[:-1]])
+    ultimos = np.r_[primeros[1:] - 1, len(orden) - 1]
+
+    return np.unique(validos[orden[np.r_[primeros, ultimos]]])
+
+
+def indicesLTTB(x, y, puntos):
+    """
+    Algoritmo Largest-Triangle-Three-Buckets: conserva el primer y el último punto
+    y, en cada bucket intermedio, el que forma el triángulo de mayor área con el
+    punto elegido anteriormente y el promedio del bucket siguiente.
+    """
+    xn, y = aNumerico(x), np.asarray(y, dtype=np.float64)
+    validos = np.flatnonzero(~np.isnan(y))
+    n = len(validos)
+    if puntos >= n or puntos < 3:
+        return validos
+
+    xv, yv = xn[validos], y[validos]
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+
+        # Promedio del bucket siguiente (el último punto para el bucket final)
+        if i + 2 < len(bordes):
+            siguiente = slice(bordes[i + 1], bordes[i + 2])
+            x_prom, y_prom = xv[siguiente].mean(), yv[siguiente].mean()
+        else:
+            x_prom, y_prom = xv[-1], yv[-1]
+
+        areas = np.abs((xv[anterior] - x_prom) * (yv[inicio:fin] - yv[anterior])
+                       - (xv[anterior] - xv[inicio:fin]) * (y_prom - yv[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+
+    return validos[elegidos]
+
+
+def puntosPorAncho(fig, fraccion=1.0):
+    """
+    Cantidad de columnas de píxeles disponibles para los datos en una figura.
+    """
+    return max(int(fig.get_figwidth() * fig.dpi * fraccion), 3)
+
+
+def reducirSerie(x, y, puntos, metodo='minmax'):
+    """
+    Reduce una serie a aproximadamente `puntos` puntos con el método indicado
+    ('minmax' o 'lttb'). Devuelve los arrays (x, y) reducidos; si la serie ya es
+    suficientemente corta se devuelve completa.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= puntos:
+        return x, y
+
+    if metodo == 'minmax':
+        indices = indicesMinMax(x, y, max(puntos // 2, 1))
+    elif metodo == 'lttb':
+        indices = indicesLTTB(x, y, puntos)
+    else:
+        raise ValueError(f"Método de reducción desconocido: {metodo}")
+
+    return x[indices], y[indices]
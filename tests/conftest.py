@@ -0,0 +1,39 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Fixtures compartidas por las pruebas.
+"""
+
+import os
+import sys
+
+import pytest
+
+DIR_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_PROYECTO)
+sys.path.insert(0, os.path.join(DIR_PROYECTO, 'benchmarks'))
+
+from servidor_falso import ServidorFalso  # noqa: E402
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    Módulo api apuntando al servidor falso, con el almacén y las cachés en un
+    directorio temporal.
+    """
+    monkeypatch.chdir(tmp_path)
+    import api
+
+    servidor = ServidorFalso().iniciar()
+    monkeypatch.setattr(api, 'url', servidor.url_archivo)
+    api.programador_api.configurarLimites([])
+    api.servidor = servidor
+    try:
+        yield api
+    finally:
+        servidor.detener()
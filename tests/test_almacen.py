@@ -0,0 +1,41 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Pruebas del almacén local de historial contra el servidor falso de Open-Meteo.
+"""
+
+from datetime import date, timedelta
+
+LAT, LNG = -31.4167, -64.1833
+VARIABLE = 'temperature_2m_max'
+
+
+def test_dias_recientes_se_completan_al_publicarse(api):
+    hoy = date.today()
+    desde = (hoy - timedelta(days=20)).isoformat()
+
+    # El archivo todavía no publicó los últimos 5 días
+    api.servidor.publicado = hoy - timedelta(days=5)
+    historial = api.obtenerTemperaturaHistorica(LAT, LNG, desde, hoy.isoformat(), [VARIABLE])
+    assert historial[VARIABLE].isna().sum() == 5
+
+    # Volver a consultar antes de la publicación pide de nuevo el mismo tramo
+    historial = api.obtenerTemperaturaHistorica(LAT, LNG, desde, hoy.isoformat(), [VARIABLE])
+    assert historial[VARIABLE].isna().sum() == 5
+
+    # Una vez publicados, la misma consulta los descarga y completa el almacén
+    api.servidor.publicado = hoy
+    api.servidor.reiniciarContadores()
+    historial = api.obtenerTemperaturaHistorica(LAT, LNG, desde, hoy.isoformat(), [VARIABLE])
+    assert historial[VARIABLE].notna().all()
+    assert len(api.servidor.solicitudes) == 1
+
+    # Con todo en el almacén ya no se consulta la API
+    api.servidor.reiniciarContadores()
+    historial = api.obtenerTemperaturaHistorica(LAT, LNG, desde, hoy.isoformat(), [VARIABLE])
+    assert historial[VARIABLE].notna().all()
+    assert api.servidor.solicitudes == []
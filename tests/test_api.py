@@ -0,0 +1,30 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Pruebas de la descarga del historial contra el servidor falso de Open-Meteo.
+"""
+
+LAT, LNG = -31.4167, -64.1833
+
+
+def test_historial_multiple_se_puede_modificar(api):
+    historial = api.descargarHistoricoMultiple([(LAT, LNG), (LAT + 1, LNG)], '2023-01-01', '2023-01-31',
+                                               ['temperature_2m_max'], formato="dict")
+
+    for df in historial.values():
+        df['temperature_2m_max'] *= 2
+        df.loc[0, 'temperature_2m_max'] = 1.0
+        assert df.loc[0, 'temperature_2m_max'] == 1.0
+
+
+def test_historial_horario_se_puede_modificar(api):
+    tramos = list(api.obtenerHistoricoHorario(LAT, LNG, '2023-01-01', '2023-02-28', ['temperature_2m']))
+
+    assert len(tramos) == 2
+    for tramo in tramos:
+        tramo['temperature_2m'] *= 2
+        tramo.loc[0, 'temperature_2m'] = 1.0
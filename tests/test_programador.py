@@ -0,0 +1,141 @@
+"""
+Sistema de Análisis Climático
+----------------------------------------------------
+Materia: Programación II
+Profesor: Ing. Mario Martínez
+Alumno: Braian Alejandro Pucheta
+
+Pruebas del programador de solicitudes: peso de las solicitudes, reserva de la
+interfaz, orden de los carriles y agrupación de solicitudes idénticas.
+"""
+
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import planificador  # noqa: E402
+import programador  # noqa: E402
+
+URL = "https://archive-api.open-meteo.com/v1/archive"
+
+
+def urlArchivo(ubicaciones, desde, hasta, variables):
+    return URL + "?" + urlencode({
+        "latitude": ",".join(str(lat) for lat, _ in ubicaciones),
+        "longitude": ",".join(str(lng) for _, lng in ubicaciones),
+        "start_date": desde,
+        "end_date": hasta,
+        "daily": ",".join(variables),
+    })
+
+
+def test_peso_por_ubicaciones_dias_y_variables():
+    assert programador.pesoSolicitud(urlArchivo([(1, 2)], "2020-01-01", "2020-01-14", ["a"])) == 1
+    assert programador.pesoSolicitud(urlArchivo([(1, 2)], "2020-01-01", "2020-01-15", ["a"])) == 2
+    assert programador.pesoSolicitud(urlArchivo([(1, 2), (3, 4)], "2020-01-01", "2020-01-14",
+                                                ["v%d" % i for i in range(11)])) == 4
+    assert programador.pesoSolicitud(URL.replace("archive", "forecast")
+                                     + "?latitude=1&longitude=2&hourly=a&forecast_days=16") == 2
+
+
+def test_masiva_respeta_la_reserva():
+    cubo = programador.CuboTokens("archivo", tasa=1, capacidad=50, ruta=None)
+
+    assert cubo.tomar(30, reserva=10) == 0
+    # Quedan 20 fichas: tomar 15 dejaría menos que la reserva
+    assert cubo.tomar(15, reserva=10) > 0
+    assert cubo.disponibles() == pytest.approx(20, abs=0.5)
+
+    # Una solicitud que no cabe junto a la reserva nunca se admitiría
+    with pytest.raises(ValueError):
+        cubo.tomar(45, reserva=10)
+
+
+def test_solo_la_interactiva_deja_el_cubo_en_deuda():
+    cubo = programador.CuboTokens("archivo", tasa=1, capacidad=50, ruta=None)
+
+    assert cubo.tomar(126) == 0
+    assert cubo.disponibles() == pytest.approx(-76, abs=0.5)
+
+
+def test_peso_maximo_segun_carril():
+    programa = programador.Programador([(r"/v1/archive", 5, 50)], ruta=None)
+
+    assert programa.pesoMaximo(URL) is None
+    with programa.prioridad(programador.MASIVA):
+        assert programa.pesoMaximo(URL) == pytest.approx(40)
+        with pytest.raises(ValueError):
+            programa.adquirir(urlArchivo([(1, 2)], "2020-01-01", "2024-12-31", ["a"]))
+
+    assert programa.pesoMaximo("https://otro.servicio/") is None
+
+
+def test_planificador_no_supera_el_peso_maximo():
+    ubicaciones = [(float(i), float(i)) for i in range(50)]
+    faltantes = {ubicacion: [("2020-01-01", "2024-12-31", ["a", "b"])] for ubicacion in ubicaciones}
+
+    plan = planificador.planificarSolicitudes(faltantes, max_peso=40)
+
+    pesos = [programador.pesoSolicitud(urlArchivo(s.ubicaciones, s.desde, s.hasta, s.variables))
+             for s in plan]
+    assert max(pesos) <= 40
+    assert {u for s in plan for u in s.ubicaciones} == set(ubicaciones)
+
+
+def test_interactivas_antes_que_masivas():
+    programa = programador.Programador([(r"/v1/archive", 10, 1)], ruta=None, reserva=0)
+    programa.adquirir(URL)  # Vacía el cubo
+
+    orden = []
+
+    def solicitar(carril):
+        with programa.prioridad(carril):
+            programa.adquirir(URL)
+        orden.append(carril)
+
+    masiva = threading.Thread(target=solicitar, args=(programador.MASIVA,))
+    masiva.start()
+    time.sleep(0.02)
+    interactiva = threading.Thread(target=solicitar, args=(programador.INTERACTIVA,))
+    interactiva.start()
+    masiva.join()
+    interactiva.join()
+
+    assert orden == [programador.INTERACTIVA, programador.MASIVA]
+    assert programa.estadisticas()["solicitudes"] == {programador.INTERACTIVA: 2, programador.MASIVA: 1}
+
+
+def test_agrupar_comparte_resultado_y_excepcion():
+    programa = programador.Programador([], ruta=None)
+    llamadas = []
+
+    def lenta():
+        llamadas.append(1)
+        time.sleep(0.1)
+        return object()
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(programa.agrupar("clave", lenta)))
+             for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(llamadas) == 1
+    assert len({id(resultado) for resultado in resultados}) == 1
+    assert programa.agrupadas == 4
+
+    def falla():
+        raise RuntimeError("sin red")
+
+    with pytest.raises(RuntimeError):
+        programa.agrupar("clave", falla)
+    # Terminada la llamada, la clave vuelve a ejecutarse
+    assert programa.agrupar("clave", lambda: 1) == 1
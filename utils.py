@@ -10,14 +10,66 @@ de datos climáticos, incluyendo generación de gráficos, cálculos estadístic
 y manipulación de datos meteorológicos.
 """
 
+import os
+import re
+import io
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import pyarrow.feather as feather
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import streamlit as st
 import numpy as np
+import ciudades
+import agregados
+import reduccion
+import cache
+import catalogo
+import diario
+import estadisticas
+import metricas
 
 # Constantes globales
 FILE_PAISES = 'paises_ciudades.csv'
+FILE_PAISES_BINARIO = 'paises_ciudades.feather'
+COLUMNAS_PAISES = ['country', 'city_ascii', 'city', 'lat', 'lng', 'admin_name', 'population']
+
+# Esquema de tipos de las columnas del historial, tomado del catálogo de variables
+ESQUEMA_HISTORIAL = catalogo.esquema()
+
+# Compresión de los CSV según su extensión
+COMPRESIONES = {'.gz': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+
+# Nombre de los archivos exportados: País_Ciudad_AAAA-MM-DD_AAAA-MM-DD.extensión
+PATRON_ARCHIVO_HISTORIAL = re.compile(r'^(.+)_\d{4}-\d{2}-\d{2}_\d{4}-\d{2}-\d{2}\.')
+
+# Formato de las fechas en los archivos exportados
+FORMATO_FECHA = '%d/%m/%Y'
+
+# Columnas del historial expresadas en segundos
+COLUMNAS_DURACION = catalogo.variablesConUnidad('s')
+
+# Direcciones cardinales en sentido horario a partir del norte, cada una cubre 22.5°
+DIRECCIONES_VIENTO = np.array(["N", "N/NE", "NE", "E/NE", "E", "E/SE", "SE", "S/SE",
+                               "S", "S/SO", "SO", "O/SO", "O", "O/NO", "NO", "N/NO"])
+
+# Límites de los rangos de velocidad (km/h) para la rosa de los vientos
+LIMITES_ROSA_VIENTOS = [0, 5, 10, 20, 30, 40, np.inf]
+
+# Nombres de los meses del año
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+# Agregaciones por defecto del resumen diario del pronóstico
+AGREGACIONES_DIARIAS = {
+    'Mínima °C': ('Temperatura °C', 'min'),
+    'Máxima °C': ('Temperatura °C', 'max'),
+    'Precipitación mm': ('Precipitacion mm', 'sum'),
+}
+
+# Caché de imágenes de gráficos ya generados (sin vencimiento, desalojo LRU)
+cache_graficos = cache.CacheTTL([(r'.*', None)], max_entradas=64)
 
 # Configuración del estilo de visualización
 plt.style.use("dark_background")
@@ -33,60 +85,183 @@ def generarMenu():
         
         st.image('img/logo-ucasal.png', use_column_width=True)
 
+def compilarPaises(ruta_csv=FILE_PAISES, ruta_binario=FILE_PAISES_BINARIO):
+    """
+    Convierte el CSV de países y ciudades a un archivo Feather sin comprimir, con el
+    país como categoría, las coordenadas en float32 y las filas ya ordenadas.
+    """
+    data = pd.read_csv(ruta_csv, usecols=lambda columna: columna in COLUMNAS_PAISES)
+    data.sort_values(by=['country','city_ascii'], ascending=True, inplace=True, ignore_index=True)
+
+    data['country'] = data['country'].astype('category')
+    data[['lat', 'lng']] = data[['lat', 'lng']].astype(np.float32)
+
+    temporal = f"{ruta_binario}.{os.getpid()}.tmp"
+    feather.write_feather(data, temporal, compression='uncompressed')
+    os.replace(temporal, ruta_binario)
+
 @st.cache_data
 def obtenerPaises():
     """
-    Carga y ordena el dataset de países y ciudades.
+    Carga el dataset de países y ciudades desde su versión binaria, mapeada en memoria.
+    El archivo binario se regenera automáticamente cuando el CSV es más reciente.
+    El mapeo evita interpretar el CSV y ordenarlo, pero la conversión a DataFrame
+    copia las columnas a memoria.
     """
-    data = pd.read_csv(FILE_PAISES)
-    data.sort_values(by=['country','city_ascii'], ascending=True, inplace=True)
+    if os.path.exists(FILE_PAISES) and (
+            not os.path.exists(FILE_PAISES_BINARIO)
+            or os.path.getmtime(FILE_PAISES) > os.path.getmtime(FILE_PAISES_BINARIO)):
+        compilarPaises()
+
+    data = feather.read_table(FILE_PAISES_BINARIO, memory_map=True).to_pandas()
 
     return data
 
+@st.cache_resource
+def obtenerIndiceCiudades():
+    """
+    Carga el índice de ciudades, construyéndolo y guardándolo si el CSV o su versión
+    compilada cambió.
+    """
+    return ciudades.cargarIndice(FILE_PAISES, obtenerPaises, fuentes=[FILE_PAISES_BINARIO])
+
+def obtenerSectoresViento(direcciones):
+    """
+    Convierte direcciones del viento en grados al índice de su sector cardinal
+    (0 = N, 1 = N/NE, ..., 15 = N/NO). Los valores nulos devuelven -1.
+    """
+    grados = np.asarray(direcciones, dtype=np.float64)
+
+    # Cada sector cubre 22.5°, centrado en su dirección: se desplaza medio sector y se divide
+    sectores = np.floor((np.mod(grados, 360) + 11.25) / 22.5) % 16
+
+    return np.where(np.isnan(grados), -1, sectores).astype(np.int64)
+
+
+def obtenerDireccionesViento(direcciones):
+    """
+    Convierte un array de direcciones del viento en grados a su representación cardinal.
+    """
+    sectores = obtenerSectoresViento(direcciones)
+
+    return np.where(sectores >= 0, DIRECCIONES_VIENTO[sectores], None)
+
+
 def obtenerDireccionViento(direction):
     """
     Convierte la dirección del viento en grados a su representación cardinal.
     """
-    # Incremento para ajustar el rango de grados en cada dirección
-    ddeg = 11.25
-
-    # Mapeo de rangos de grados a direcciones cardinales
-    if direction >= (360 - ddeg) or direction < (0 + ddeg):
-        common_dir = "N"
-    elif direction >= (337.5 - ddeg) and direction < (337.5 + ddeg):
-        common_dir = "N/NO"
-    elif direction >= (315 - ddeg) and direction < (315 + ddeg):
-        common_dir = "NO"
-    elif direction >= (292.5 - ddeg) and direction < (292.5 + ddeg):
-        common_dir = "O/NO"
-    elif direction >= (270 - ddeg) and direction < (270 + ddeg):
-        common_dir = "O"
-    elif direction >= (247.5 - ddeg) and direction < (247.5 + ddeg):
-        common_dir = "O/SO"
-    elif direction >= (225 - ddeg) and direction < (225 + ddeg):
-        common_dir = "SO"
-    elif direction >= (202.5 - ddeg) and direction < (202.5 + ddeg):
-        common_dir = "S/SO"
-    elif direction >= (180 - ddeg) and direction < (180 + ddeg):
-        common_dir = "S"
-    elif direction >= (157.5 - ddeg) and direction < (157.5 + ddeg):
-        common_dir = "S/SE"
-    elif direction >= (135 - ddeg) and direction < (135 + ddeg):
-        common_dir = "SE"
-    elif direction >= (112.5 - ddeg) and direction < (112.5 + ddeg):
-        common_dir = "E/SE"
-    elif direction >= (90 - ddeg) and direction < (90 + ddeg):
-        common_dir = "E"
-    elif direction >= (67.5 - ddeg) and direction < (67.5 + ddeg):
-        common_dir = "E/NE"
-    elif direction >= (45 - ddeg) and direction < (45 + ddeg):
-        common_dir = "NE"
-    elif direction >= (22.5 - ddeg) and direction < (22.5 + ddeg):
-        common_dir = "N/NE"
+    common_dir = obtenerDireccionesViento(direction).item()
 
     return common_dir
 
 
+def rosaDeLosVientos(direcciones, velocidades, limites=LIMITES_ROSA_VIENTOS, porcentaje=True):
+    """
+    Calcula la rosa de los vientos: la frecuencia de cada sector cardinal por rango
+    de velocidad (km/h). Devuelve un DataFrame con un sector por fila y un rango
+    por columna, en porcentaje del total o en cantidad de registros.
+    """
+    sectores = obtenerSectoresViento(direcciones)
+    velocidades = np.asarray(velocidades, dtype=np.float64)
+    limites = np.asarray(limites, dtype=np.float64)
+
+    # Rango de velocidad de cada registro (0 = primer rango)
+    num_rangos = len(limites) - 1
+    rangos = np.clip(np.searchsorted(limites, velocidades, side='right') - 1, 0, num_rangos - 1)
+
+    # Conteo conjunto sector x rango en una sola pasada
+    validos = (sectores >= 0) & ~np.isnan(velocidades)
+    conteo = np.bincount(sectores[validos] * num_rangos + rangos[validos],
+                         minlength=len(DIRECCIONES_VIENTO) * num_rangos)
+    conteo = conteo.reshape(len(DIRECCIONES_VIENTO), num_rangos)
+
+    if porcentaje and conteo.sum() > 0:
+        conteo = conteo / conteo.sum() * 100
+
+    etiquetas = [f"{limites[i]:g}-{limites[i + 1]:g}" if np.isfinite(limites[i + 1])
+                 else f">{limites[i]:g}" for i in range(num_rangos)]
+
+    return pd.DataFrame(conteo, index=DIRECCIONES_VIENTO, columns=etiquetas)
+
+
+def prepararDatos(df):
+    """
+    Prepara un historial para los gráficos y estadísticas: interpreta las fechas,
+    convierte las duraciones de segundos a horas y usa la fecha como índice.
+    Si el DataFrame ya fue preparado se devuelve sin cambios.
+    """
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df
+
+    return _prepararDatos(df)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _prepararDatos(df):
+    """
+    Realiza la preparación una única vez por contenido del DataFrame.
+    """
+    df_data = df.copy()
+
+    # Las fechas pueden venir como texto (archivo exportado) o ya interpretadas
+    df_data['date'] = interpretarFechas(df_data['date'])
+
+    # Conversión de segundos a horas
+    for columna in COLUMNAS_DURACION:
+        if columna in df_data:
+            df_data[columna] = df_data[columna] / 3600
+
+    return df_data.set_index('date')
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def obtenerCubo(df):
+    """
+    Construye el cubo de agregados de un historial preparado, una vez por contenido.
+    """
+    return agregados.CuboAgregados(df)
+
+
+def huellaDatos(df):
+    """
+    Calcula una huella del contenido de un DataFrame (valores e índice) para usarla como clave.
+    """
+    valores = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    huella = hashlib.blake2b(valores.tobytes(), digest_size=16)
+    huella.update(','.join(map(str, df.columns)).encode())
+
+    return huella.hexdigest()
+
+
+@metricas.medir()
+def renderizarGrafico(funcion, df, huella=None, **parametros):
+    """
+    Devuelve la imagen PNG de un gráfico, reutilizando la ya generada para los
+    mismos datos, tipo de gráfico y parámetros. La figura se cierra siempre
+    después de codificarla para no acumular figuras en el servidor.
+    """
+    huella = huella or huellaDatos(df)
+    clave = f"{funcion.__name__}:{huella}:{sorted(parametros.items())}"
+
+    encontrado, imagen = cache_graficos.obtener(clave)
+    if encontrado:
+        return imagen
+
+    fig = funcion(df, **parametros)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+    finally:
+        plt.close(fig)
+
+    imagen = buffer.getvalue()
+    cache_graficos.guardar(clave, imagen)
+
+    return imagen
+
+
+@metricas.medir()
 def mostrarGraficoSemanal(df):
     """
     Genera un gráfico de líneas con temperatura y precipitaciones semanales.
@@ -95,13 +270,18 @@ def mostrarGraficoSemanal(df):
     fig, ax1 = plt.subplots(figsize=(10, 5))
     ax2 = ax1.twinx()
 
+    # Reducción de puntos al ancho de la figura, conservando picos
+    puntos = reduccion.puntosPorAncho(fig)
+    fechas_temp, temperatura = reduccion.reducirSerie(df["Fecha"], df['Temperatura °C'], puntos)
+    fechas_prec, precipitacion = reduccion.reducirSerie(df["Fecha"], df['Precipitacion mm'], puntos)
+
     # Gráfico de temperatura
-    ax1.plot(df["Fecha"], df['Temperatura °C'], label="Temperatura °C", color="tab:orange")
+    ax1.plot(fechas_temp, temperatura, label="Temperatura °C", color="tab:orange")
     ax1.set_ylabel("Temperatura °C", color="tab:orange")
     ax1.set_title('Temperatura Semanal')
 
     # Gráfico de precipitaciones
-    ax2.plot(df["Fecha"], df['Precipitacion mm'], label="Precipitacion mm", color="tab:cyan")
+    ax2.plot(fechas_prec, precipitacion, label="Precipitacion mm", color="tab:cyan")
     ax2.set_ylabel("Precipitacion mm", color="tab:cyan")
     ax2.set_ylim(0, 30)
 
@@ -116,42 +296,42 @@ def mostrarGraficoSemanal(df):
     return fig
 
 
+@metricas.medir()
 def mostrarGraficoTemperatura(df):
     """
     Genera un gráfico completo de variables climáticas (temperatura, precipitación, viento).
     """
     # Preparación de datos
-    df_data = df.dropna(subset=['temperature_2m_max', 'temperature_2m_min', 
-                               'precipitation_sum', 'wind_speed_10m_max'])
-    df_data.loc[:, "date"] = pd.to_datetime(df_data['date'], format='%d/%m/%Y')
-    df_data.set_index('date', inplace=True)
-    
-    # Determinar período de agrupación según cantidad de días
-    num_dias = len(df_data)
-    if num_dias <= 30:
-        df_data = df_data  # Datos diarios
-    elif 30 < num_dias <= 180:
-        df_data = df_data.resample('W').mean()  # Datos semanales
-    elif 180 < num_dias <= 2000:
-        df_data = df_data.resample('ME').mean()  # Datos mensuales
-    else:
-        df_data = df_data.resample('A').mean()  # Datos anuales
+    df = prepararDatos(df)
+    df_data = df.dropna(subset=['temperature_2m_max', 'temperature_2m_min',
+                                'precipitation_sum', 'wind_speed_10m_max'])
+
+    # Nivel de agrupación según cantidad de días, tomado del cubo de agregados
+    cubo = obtenerCubo(df)
+    df_data = cubo.serie(cubo.nivelPara(len(df_data)), 'mean')
 
    # Conversión a arrays NumPy para mejor rendimiento
     dias = df_data.index
-    temperatura_max = df_data['temperature_2m_max'].to_numpy()
-    temperatura_min = df_data['temperature_2m_min'].to_numpy()
     precipitacion = df_data['precipitation_sum'].to_numpy()
     viento = df_data['wind_speed_10m_max'].to_numpy()
 
     # Creación del gráfico
     fig, ax = plt.subplots(figsize=(10, 6))
-    
+
+    # Las temperaturas se grafican con los extremos diarios reducidos al ancho de la
+    # figura, para no promediar los picos; viento y precipitación usan el nivel agrupado
+    puntos = reduccion.puntosPorAncho(fig)
+    extremos = cubo.serie('diario', 'max')['temperature_2m_max']
+    dias_max, temperatura_max = reduccion.reducirSerie(extremos.index, extremos.to_numpy(), puntos)
+    extremos = cubo.serie('diario', 'min')['temperature_2m_min']
+    dias_min, temperatura_min = reduccion.reducirSerie(extremos.index, extremos.to_numpy(), puntos)
+
     # Gráficos de variables climáticas
-    ax.plot(dias, temperatura_max, label="Temperatura Max (°C)", color='orange', linestyle='-')
-    ax.plot(dias, temperatura_min, label="Temperatura Min (°C)", color='cyan', linestyle='-')
+    ax.plot(dias_max, temperatura_max, label="Temperatura Max (°C)", color='orange', linestyle='-')
+    ax.plot(dias_min, temperatura_min, label="Temperatura Min (°C)", color='cyan', linestyle='-')
     ax.bar(dias, precipitacion, label="Precipitación (mm)", color='g', alpha=0.7, width=30)
-    ax.plot(dias, viento, label="Viento (km/h)", color='r', linestyle='-.', marker='^')
+    ax.plot(dias, viento, label="Viento (km/h)", color='r', linestyle='-.',
+            marker='^' if len(dias) <= 60 else None)
 
     # Configuración del gráfico
     ax.set_title('Evolución Climática: Temperatura, Viento y Precipitaciones')
@@ -164,30 +344,56 @@ def mostrarGraficoTemperatura(df):
 
     return fig
 
-def mostrarGraficoLuz(df):
+def datosGraficoLuz(df):
     """
-    Genera un gráfico de barras apiladas mostrando la duración de la luz solar.
+    Calcula por mes del año la media de horas de luz de día, de sol directo y nubladas.
     """
-    # Preparación de datos
-    df_data = df.dropna(subset=['daylight_duration', 'sunshine_duration'])
-    df_data.loc[:, "date"] = pd.to_datetime(df_data['date'], format='%d/%m/%Y')
-    df_data['month'] = pd.to_datetime(df_data['date']).dt.month
-
-    # Conversión de segundos a horas
-    df_data.loc[:, 'daylight_duration'] /= 3600
-    df_data.loc[:, 'sunshine_duration'] /= 3600
-    df_data.set_index('date', inplace=True)
+    # Preparación de datos (duraciones ya convertidas a horas)
+    df_data = prepararDatos(df).dropna(subset=['daylight_duration', 'sunshine_duration'])
 
     # Agrupación mensual
-    monthly_data = df_data.groupby('month').agg({
+    monthly_data = df_data.groupby(df_data.index.month).agg({
         'daylight_duration': 'mean',
         'sunshine_duration': 'mean'
     }).reindex(range(1, 13))
 
     # Cálculo de tiempo nublado
-    monthly_data['cloudy_duration'] = (monthly_data['daylight_duration'] - 
+    monthly_data['cloudy_duration'] = (monthly_data['daylight_duration'] -
                                      monthly_data['sunshine_duration'])
 
+    return monthly_data
+
+
+def datosGraficoTemperatura(df):
+    """
+    Obtiene los datos compactos del gráfico de evolución climática para un gráfico
+    interactivo: en el nivel de agrupación que corresponda, la máxima y mínima
+    extremas del período (no promediadas), la precipitación y el viento medios.
+    """
+    df = prepararDatos(df)
+    df_data = df.dropna(subset=['temperature_2m_max', 'temperature_2m_min',
+                                'precipitation_sum', 'wind_speed_10m_max'])
+
+    cubo = obtenerCubo(df)
+    nivel = cubo.nivelPara(len(df_data))
+    medias = cubo.serie(nivel, 'mean')
+
+    return pd.DataFrame({
+        'Temperatura Max (°C)': cubo.serie(nivel, 'max')['temperature_2m_max'],
+        'Temperatura Min (°C)': cubo.serie(nivel, 'min')['temperature_2m_min'],
+        'Precipitación (mm)': medias['precipitation_sum'],
+        'Viento (km/h)': medias['wind_speed_10m_max'],
+    }).astype(np.float32)
+
+
+@metricas.medir()
+def mostrarGraficoLuz(df):
+    """
+    Genera un gráfico de barras apiladas mostrando la duración de la luz solar.
+    """
+    # Medias mensuales de luz de día, sol directo y tiempo nublado
+    monthly_data = datosGraficoLuz(df)
+
     # Creación del gráfico
     fig, ax = plt.subplots(figsize=(7, 4))
     
@@ -199,12 +405,9 @@ def mostrarGraficoLuz(df):
            label='Luz sin sol directo', color='skyblue')
 
     # Configuración de etiquetas y formato
-    month_names_es = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
-                      'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
-    
     present_months = monthly_data.index[monthly_data['sunshine_duration'].notnull()]
     ax.set_xticks(present_months)
-    ax.set_xticklabels([month_names_es[i - 1] for i in present_months])
+    ax.set_xticklabels([MESES[i - 1] for i in present_months])
     
     ax.set_xlabel('Meses')
     ax.set_ylabel('Horas')
@@ -217,33 +420,35 @@ def mostrarGraficoLuz(df):
     return fig
 
 
-def mostrarGraficoRadiacion(df):
+def datosGraficoRadiacion(df):
     """
-    Genera un gráfico de dispersión para mostrar la relación entre duración
-    de luz solar y radiación solar.
+    Obtiene las medias de luz solar y radiación agrupadas según la cantidad de días.
     """
-    # Preparación de datos
+    # Preparación de datos (duraciones ya convertidas a horas)
+    df = prepararDatos(df)
     df_data = df.dropna(subset=['daylight_duration', 'sunshine_duration',
-                               'shortwave_radiation_sum'])
-    df_data.loc[:, "date"] = pd.to_datetime(df_data['date'], format='%d/%m/%Y')
-    df_data.set_index('date', inplace=True)
+                                'shortwave_radiation_sum'])
+
+    # Nivel de agrupación según cantidad de días, tomado del cubo de agregados
+    cubo = obtenerCubo(df)
+    df_data = cubo.serie(cubo.nivelPara(len(df_data)), 'mean')
     df_data = df_data[['daylight_duration', 'sunshine_duration',
-                       'shortwave_radiation_sum']]
+                       'shortwave_radiation_sum']].copy()
 
     # Conversión de unidades
-    df_data.loc[:, 'sunshine_duration'] /= 3600
-    df_data.loc[:, 'shortwave_radiation_sum'] /= 3600
-
-    # Determinar período de agrupación
-    num_dias = len(df_data)
-    if num_dias <= 30:
-        df_data = df_data  # Datos diarios
-    elif 30 < num_dias <= 180:
-        df_data = df_data.resample('W').mean()  # Datos semanales
-    elif 180 < num_dias <= 2000:
-        df_data = df_data.resample('ME').mean()  # Datos mensuales
-    else:
-        df_data = df_data.resample('A').mean()  # Datos anuales
+    df_data['shortwave_radiation_sum'] /= 3600
+
+    return df_data
+
+
+@metricas.medir()
+def mostrarGraficoRadiacion(df):
+    """
+    Genera un gráfico de dispersión para mostrar la relación entre duración
+    de luz solar y radiación solar.
+    """
+    # Medias de luz solar y radiación en el nivel de agrupación que corresponda
+    df_data = datosGraficoRadiacion(df)
 
     # Creación del gráfico
     fig, ax1 = plt.subplots(figsize=(14, 6))
@@ -259,78 +464,164 @@ def mostrarGraficoRadiacion(df):
     return fig
 
 
-def temperaturaDiaria(df):
+@metricas.medir()
+def temperaturaDiaria(df, agregaciones=None):
     """
-    Procesa y agrupa datos de temperatura por día.
+    Procesa y agrupa datos de temperatura por día. Por defecto calcula la mínima,
+    la máxima y la precipitación total; se pueden indicar otras agregaciones.
     """
-    df['datetime'] = pd.to_datetime(df['Fecha'])
-    
-    # Agrupación por fecha para temperaturas
-    result = df.groupby(df['datetime'].dt.date)['Temperatura °C'].agg(
-        ['min', 'max']
-    ).reset_index()
-    
-    # Agregar precipitaciones
-    precipitacion = df.groupby(df['datetime'].dt.date)['Precipitacion mm'].agg(
-        'sum'
-    ).reset_index()
-
-    # Unificar datos
-    result = result.merge(precipitacion, on='datetime', how='left')
-    result.columns = ['Fecha', 'Mínima °C', 'Máxima °C', 'Precipitación mm']
+    result = diario.resumirPorDia(df, agregaciones or AGREGACIONES_DIARIAS)
+    result['Fecha'] = result['Fecha'].dt.date
 
     return result
 
 
+def interpretarFechas(fechas):
+    """
+    Convierte la columna de fechas del historial a datetime64, aceptando el formato
+    de exportación (DD/MM/AAAA) o ISO.
+    """
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        return fechas
+
+    try:
+        return pd.to_datetime(fechas, format=FORMATO_FECHA)
+    except ValueError:
+        return pd.to_datetime(fechas, format='ISO8601')
+
+
+@metricas.medir()
+def leerArchivoHistorial(archivo):
+    """
+    Lee un archivo de historial (CSV, CSV comprimido con gzip o zstd, Parquet o Excel)
+    aplicando el esquema de tipos y con la columna de fechas ya interpretada.
+    """
+    nombre = getattr(archivo, 'name', str(archivo)).lower()
+
+    if nombre.endswith('.parquet'):
+        df = pd.read_parquet(archivo)
+    elif nombre.endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(archivo)
+    else:
+        compresion = COMPRESIONES.get(os.path.splitext(nombre)[1])
+        df = pd.read_csv(archivo, dtype=ESQUEMA_HISTORIAL, compression=compresion, engine='pyarrow')
+
+    # Esquema explícito también para los formatos que no lo aplican al leer
+    columnas = {columna: tipo for columna, tipo in ESQUEMA_HISTORIAL.items() if columna in df}
+    df = df.astype(columnas)
+    if 'date' in df:
+        df['date'] = interpretarFechas(df['date'])
+
+    return df
+
+
+def obtenerUbicacionArchivo(archivo):
+    """
+    Obtiene la ubicación a partir del nombre de un archivo exportado por la aplicación
+    (País_Ciudad_desde_hasta). Devuelve una cadena vacía si el nombre no sigue ese formato.
+    """
+    nombre = os.path.basename(getattr(archivo, 'name', str(archivo)))
+    coincidencia = PATRON_ARCHIVO_HISTORIAL.match(nombre)
+
+    return coincidencia.group(1) if coincidencia else ''
+
+
+def archivosSinUbicacion(archivos):
+    """
+    Devuelve los nombres de los archivos que no siguen el formato País_Ciudad_desde_hasta,
+    cuya ubicación no se puede conocer.
+    """
+    return [os.path.basename(getattr(archivo, 'name', str(archivo))) for archivo in archivos
+            if not obtenerUbicacionArchivo(archivo)]
+
+
+def latitudesArchivos(archivos):
+    """
+    Devuelve un diccionario {ubicación: latitud} con las ubicaciones de los archivos
+    cuyo nombre corresponde a una ciudad conocida (País_Ciudad_desde_hasta).
+    """
+    indice = obtenerIndiceCiudades()
+    latitudes = {}
+
+    for archivo in archivos:
+        ubicacion = obtenerUbicacionArchivo(archivo)
+
+        # El país y la ciudad pueden contener guiones bajos: se prueba cada división
+        partes = ubicacion.split('_')
+        for i in range(1, len(partes)):
+            clave = ('_'.join(partes[:i]), '_'.join(partes[i:]))
+            if clave in indice.posiciones:
+                latitudes[ubicacion] = indice.coordenadas(*clave)[0]
+                break
+
+    return latitudes
+
+
+@metricas.medir()
 def cargarHistorialDesdeArchivos(archivos):
     """
-    Carga datos históricos desde uno o varios archivos y los concatena si son múltiples.
+    Carga datos históricos desde uno o varios archivos, leyéndolos en paralelo, y los
+    concatena si son múltiples. Los días repetidos entre archivos de una misma ubicación
+    se conservan una sola vez (el del último archivo). Los archivos cuyo nombre no indica
+    la ubicación se toman como una ubicación aparte, identificada por el nombre del archivo.
     """
     # Asegurarse de que 'archivos' es una lista
     if not isinstance(archivos, list):
         archivos = [archivos]
 
-    dfs = []  # Lista para almacenar los DataFrames de cada archivo
+    # Lectura concurrente de todos los archivos, conservando su orden
+    with ThreadPoolExecutor(max_workers=min(8, len(archivos))) as executor:
+        dfs = list(executor.map(leerArchivoHistorial, archivos))
 
-    for archivo in archivos:
-        if archivo.name.endswith(".csv"):
-            df = pd.read_csv(archivo)
-        else:
-            df = pd.read_excel(archivo)
-        
-        dfs.append(df)  # Añadir el DataFrame a la lista
+    # Si es solo uno, devolver el único DataFrame
+    if len(dfs) == 1:
+        return dfs[0]
 
-     # Concatenar todos los DataFrames si hay múltiples archivos, sino devolver el único
-    if len(dfs) > 1:
-        df_completo = pd.concat(dfs, ignore_index=True)
-    else:
-        df_completo = dfs[0]  # Si es solo uno, devolver el único DataFrame
+    ubicaciones = [obtenerUbicacionArchivo(archivo) or os.path.basename(getattr(archivo, 'name', str(archivo)))
+                   for archivo in archivos]
+    varias_ubicaciones = len(set(ubicaciones)) > 1
+
+    partes = []
+    for ubicacion in dict.fromkeys(ubicaciones):
+        df = pd.concat([df for df, u in zip(dfs, ubicaciones) if u == ubicacion], ignore_index=True)
+
+        # Eliminar los días superpuestos entre archivos de la misma ubicación
+        if 'date' in df:
+            df = df.drop_duplicates(subset='date', keep='last').sort_values('date')
+
+        if varias_ubicaciones:
+            df.insert(0, 'ubicacion', ubicacion)
+        partes.append(df)
+
+    df_completo = pd.concat(partes, ignore_index=True)
 
     return df_completo
 
 
+@metricas.medir()
 def obtenerDatosEstadisticos(df):
     """
-    Calcula estadísticas básicas a partir de un DataFrame con datos meteorológicos.
+    Calcula estadísticas básicas a partir de un DataFrame con datos meteorológicos,
+    con los acumuladores del resumen estadístico (ver estadisticas.py).
     """
     # Eliminar filas con valores nulos en las columnas relevantes
-    df = df.dropna(subset=['temperature_2m_max', 'temperature_2m_min', 
-                          'precipitation_sum', 'wind_speed_10m_max'])
-
-    # Convertir las columnas del DataFrame a arrays de NumPy para optimizar cálculos
-    temperatura_max = df['temperature_2m_max'].to_numpy()
-    temperatura_min = df['temperature_2m_min'].to_numpy()
-    precipitacion = df['precipitation_sum'].to_numpy()
-    viento = df['wind_speed_10m_max'].to_numpy()
-    luz = df['daylight_duration'].to_numpy()
-
-    # Calcular estadísticas básicas utilizando funciones de NumPy
-    temp_max = np.max(temperatura_max)
-    temp_min = np.min(temperatura_min)
-    temp_media = np.mean([temperatura_max, temperatura_min])
-    precipitacion_media = np.mean(precipitacion)
-    viento_media = np.mean(viento)
-    luz_media = np.mean(luz) / 3600
+    df = prepararDatos(df).dropna(subset=['temperature_2m_max', 'temperature_2m_min',
+                                          'precipitation_sum', 'wind_speed_10m_max'])
+
+    # Resumen de cada variable en una sola pasada
+    resumen = estadisticas.ResumenEstadistico(['temperature_2m_max', 'temperature_2m_min',
+                                               'precipitation_sum', 'wind_speed_10m_max',
+                                               'daylight_duration'])
+    resultado = resumen.actualizar(df).resultado()
+
+    temp_max = resultado.loc['temperature_2m_max', 'maximo']
+    temp_min = resultado.loc['temperature_2m_min', 'minimo']
+    # Ambas series tienen la misma cantidad de días: la media conjunta es el promedio de las medias
+    temp_media = (resultado.loc['temperature_2m_max', 'media']
+                  + resultado.loc['temperature_2m_min', 'media']) / 2
+    precipitacion_media = resultado.loc['precipitation_sum', 'media']
+    viento_media = resultado.loc['wind_speed_10m_max', 'media']
+    luz_media = resultado.loc['daylight_duration', 'media']
 
     # Crear diccionario con las estadísticas y sus unidades correspondientes
     estadisticas_climaticas = {